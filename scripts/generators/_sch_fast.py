@@ -0,0 +1,141 @@
+"""
+原理图批量输出加速内核（Numba）
+
+对数量级达到1e4以上的批量连线，纯Python/numpy逐条格式化成为瓶颈。
+本模块用Numba JIT把坐标与UUID直接写入预分配的字节缓冲区。
+Numba不可用时 NUMBA_AVAILABLE 为 False，调用方应退回普通输出路径。
+
+坐标按KiCad原理图内部分辨率（0.0001 mm）输出并去掉末尾多余的0。
+只有 can_emit() 为真（全部坐标有限、落在0.0001网格上且绝对值小于1e6）时，
+结果才与 "%.10g" 逐字节一致，调用方应先检查。
+"""
+
+from typing import List
+
+import numpy as np
+
+try:
+    from numba import njit
+
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """Numba不可用时的占位装饰器（保持纯Python可调用）"""
+
+        def wrap(func):
+            return func
+
+        return wrap
+
+
+# 内核可精确输出的坐标上限：6位整数 + 4位小数 = "%.10g" 的10位有效数字
+_MAX_ABS = 1e6
+
+# 每个数字最多占用的字节数：符号 + 整数部分 + 小数点 + 4位小数
+_MAX_NUM_LEN = 1 + 6 + 1 + 4
+
+
+@njit(cache=True)
+def _put(buf, pos, chunk):
+    for i in range(chunk.shape[0]):
+        buf[pos + i] = chunk[i]
+    return pos + chunk.shape[0]
+
+
+@njit(cache=True)
+def _put_num(buf, pos, v):
+    scaled = np.int64(abs(v) * 10000.0 + 0.5)
+    if v < 0 and scaled != 0:
+        buf[pos] = 45  # '-'
+        pos += 1
+
+    ip = scaled // 10000
+    fp = scaled % 10000
+
+    # 整数部分
+    ndigits = 1
+    t = ip
+    while t >= 10:
+        t //= 10
+        ndigits += 1
+    for i in range(ndigits - 1, -1, -1):
+        buf[pos + i] = 48 + ip % 10
+        ip //= 10
+    pos += ndigits
+
+    # 小数部分（去掉末尾的0）
+    if fp:
+        buf[pos] = 46  # '.'
+        pos += 1
+        d = 1000
+        while fp:
+            buf[pos] = 48 + fp // d
+            fp %= d
+            d //= 10
+            pos += 1
+    return pos
+
+
+@njit(cache=True)
+def _emit_wires_kernel(coords, uuids, p0, p1, p2, p3, p4, p5):
+    n = coords.shape[0]
+    fixed = (
+        p0.shape[0]
+        + p1.shape[0]
+        + p2.shape[0]
+        + p3.shape[0]
+        + p4.shape[0]
+        + p5.shape[0]
+        + uuids.shape[1]
+    )
+    buf = np.empty(n * (fixed + 4 * _MAX_NUM_LEN), dtype=np.uint8)
+    pos = 0
+    for i in range(n):
+        pos = _put(buf, pos, p0)
+        pos = _put_num(buf, pos, coords[i, 0])
+        pos = _put(buf, pos, p1)
+        pos = _put_num(buf, pos, coords[i, 1])
+        pos = _put(buf, pos, p2)
+        pos = _put_num(buf, pos, coords[i, 2])
+        pos = _put(buf, pos, p3)
+        pos = _put_num(buf, pos, coords[i, 3])
+        pos = _put(buf, pos, p4)
+        pos = _put(buf, pos, uuids[i])
+        pos = _put(buf, pos, p5)
+    return buf[:pos]
+
+
+def can_emit(coords: np.ndarray) -> bool:
+    """
+    判断坐标能否走内核输出且与 "%.10g" 结果一致
+
+    要求全部坐标有限、绝对值小于 _MAX_ABS、恰好落在0.0001网格上，
+    且不含 -0.0（"%.10g" 输出 "-0"）。
+    """
+    coords = np.asarray(coords, dtype=np.float64)
+    if not np.all(np.abs(coords) < _MAX_ABS):  # 同时排除 NaN/inf
+        return False
+    if np.any((coords == 0) & np.signbit(coords)):
+        return False
+    return bool(np.array_equal(np.round(coords * 10000.0) / 10000.0, coords))
+
+
+def emit_wires(coords: np.ndarray, uuids: List[str], parts: List[bytes]) -> bytes:
+    """
+    批量输出连线
+
+    Args:
+        coords: (N, 4) 坐标数组 x1, y1, x2, y2
+        uuids: N个UUID字符串
+        parts: 6段固定文本，依次位于4个坐标、UUID之间及首尾
+
+    Returns:
+        bytes: ASCII编码的S-expression片段
+    """
+    n = len(coords)
+    ids = np.frombuffer("".join(uuids).encode("ascii"), dtype=np.uint8).reshape(n, -1)
+    p = [np.frombuffer(part, dtype=np.uint8) for part in parts]
+    out = _emit_wires_kernel(np.ascontiguousarray(coords, dtype=np.float64), ids, *p)
+    return out.tobytes()
@@ -5,13 +5,90 @@ PCB文件生成器
 生成的文件可直接在KiCad GUI中打开。
 """
 
-from typing import List, Dict, Tuple, Optional
+from typing import Callable, List, Dict, TextIO, Tuple, Optional
 from dataclasses import dataclass, field
+import io
 import logging
 import uuid
 
 logger = logging.getLogger(__name__)
 
+# 层定义（静态）
+_LAYERS_LINES = [
+    "  (layers",
+    '    (0 "F.Cu" signal)',
+    '    (31 "B.Cu" signal)',
+    '    (32 "B.Adhes" user)',
+    '    (33 "F.Adhes" user)',
+    '    (34 "B.Paste" user)',
+    '    (35 "F.Paste" user)',
+    '    (36 "B.SilkS" user)',
+    '    (37 "F.SilkS" user)',
+    '    (38 "B.Mask" user)',
+    '    (39 "F.Mask" user)',
+    '    (40 "Dwgs.User" user)',
+    '    (41 "Cmts.User" user)',
+    '    (42 "Eco1.User" user)',
+    '    (43 "Eco2.User" user)',
+    '    (44 "Edge.Cuts" user)',
+    '    (45 "Margin" user)',
+    '    (46 "B.CrtYd" user)',
+    '    (47 "F.CrtYd" user)',
+    '    (48 "B.Fab" user)',
+    '    (49 "F.Fab" user)',
+    "  )",
+    "",
+]
+
+# Setup部分 - 必需的（静态）
+_SETUP_LINES = [
+    "  (setup",
+    "    (pad_to_mask_clearance 0)",
+    "    (pcbplotparams",
+    "      (layerselection 0x00010fc_ffffffff)",
+    "      (plot_on_all_layers_selection 0x0000000_00000000)",
+    "      (disableapertmacros no)",
+    "      (usegerberextensions no)",
+    "      (usegerberattributes yes)",
+    "      (usegerberadvancedattributes yes)",
+    "      (creategerberjobfile yes)",
+    "      (dashed_line_dash_ratio 12.000000)",
+    "      (dashed_line_gap_ratio 3.000000)",
+    "      (svgprecision 4)",
+    "      (plotframeref no)",
+    "      (viasonmask no)",
+    "      (mode 1)",
+    "      (useauxorigin no)",
+    "      (hpglpennumber 1)",
+    "      (hpglpenspeed 20)",
+    "      (hpglpendiameter 15.000000)",
+    "      (pdf_front_fp_property_popups yes)",
+    "      (pdf_back_fp_property_popups yes)",
+    "      (dxfpolygonmode yes)",
+    "      (dxfimperialunits yes)",
+    "      (dxfusepcbnewfont yes)",
+    "      (psnegative no)",
+    "      (psa4output no)",
+    "      (plotreference yes)",
+    "      (plotvalue yes)",
+    "      (plotfptext yes)",
+    "      (plotinvisibletext no)",
+    "      (sketchpadsonfab no)",
+    "      (subtractmaskfromsilk no)",
+    "      (outputformat 1)",
+    "      (mirror no)",
+    "      (drillshape 1)",
+    "      (scaleselection 1)",
+    '      (outputdirectory "")',
+    "    )",
+    "  )",
+    "",
+]
+
+# 静态块预先拼接为文本，输出时整块写入
+_LAYERS_TEXT = "\n".join(_LAYERS_LINES) + "\n"
+_SETUP_TEXT = "\n".join(_SETUP_LINES) + "\n"
+
 
 @dataclass
 class PCBComponent:
@@ -119,138 +196,93 @@ class PCBFileGenerator:
         Returns:
             str: KiCad S-expression格式的内容
         """
-        lines = []
+        buf = io.StringIO()
+        self._write(buf.write)
+        return buf.getvalue()
+
+    def generate_to(self, fp: TextIO):
+        """
+        将.kicad_pcb文件内容直接写入文本文件对象
+
+        Args:
+            fp: 已打开的文本文件对象（需支持write）
+        """
+        self._write(fp.write)
+
+    def _write(self, w: Callable[[str], object]):
+        """按顺序输出全部S-expression片段（每行以换行结尾，文件尾除外）"""
+
+        def put(lines: List[str]):
+            w("\n".join(lines))
+            w("\n")
 
         # 文件头
-        lines.append('(kicad_pcb (version 20240108) (generator "pcb-nlp-skill")')
-        lines.append("")
+        w('(kicad_pcb (version 20240108) (generator "pcb-nlp-skill")\n\n')
 
         # 通用设置
-        track_count = len(self.tracks)
-        via_count = len(self.vias)
-        lines.append("  (general")
-        lines.append(f"    (thickness {self.thickness})")
-        lines.append(f"    (drawings 4)")
-        lines.append(f"    (tracks {track_count})")
-        lines.append(f"    (zones 0)")
-        lines.append(f"    (modules {len(self.components)})")
-        lines.append(f"    (nets {len(self.nets)})")
-        lines.append("  )")
-        lines.append("")
+        put(
+            [
+                "  (general",
+                f"    (thickness {self.thickness})",
+                "    (drawings 4)",
+                f"    (tracks {len(self.tracks)})",
+                "    (zones 0)",
+                f"    (modules {len(self.components)})",
+                f"    (nets {len(self.nets)})",
+                "  )",
+                "",
+            ]
+        )
 
         # 纸张设置
-        lines.append('  (paper "A4")')
-        lines.append("")
+        w('  (paper "A4")\n\n')
 
         # 标题块
-        lines.append("  (title_block")
-        lines.append(f'    (title "{self.board_name}")')
-        lines.append('    (date "2026-02-06")')
-        lines.append('    (rev "1")')
-        lines.append('    (company "Auto Generated")')
-        lines.append("  )")
-        lines.append("")
-
-        # 层定义
-        lines.append("  (layers")
-        lines.append('    (0 "F.Cu" signal)')
-        lines.append('    (31 "B.Cu" signal)')
-        lines.append('    (32 "B.Adhes" user)')
-        lines.append('    (33 "F.Adhes" user)')
-        lines.append('    (34 "B.Paste" user)')
-        lines.append('    (35 "F.Paste" user)')
-        lines.append('    (36 "B.SilkS" user)')
-        lines.append('    (37 "F.SilkS" user)')
-        lines.append('    (38 "B.Mask" user)')
-        lines.append('    (39 "F.Mask" user)')
-        lines.append('    (40 "Dwgs.User" user)')
-        lines.append('    (41 "Cmts.User" user)')
-        lines.append('    (42 "Eco1.User" user)')
-        lines.append('    (43 "Eco2.User" user)')
-        lines.append('    (44 "Edge.Cuts" user)')
-        lines.append('    (45 "Margin" user)')
-        lines.append('    (46 "B.CrtYd" user)')
-        lines.append('    (47 "F.CrtYd" user)')
-        lines.append('    (48 "B.Fab" user)')
-        lines.append('    (49 "F.Fab" user)')
-        lines.append("  )")
-        lines.append("")
-
-        # Setup部分 - 必需的
-        lines.append("  (setup")
-        lines.append("    (pad_to_mask_clearance 0)")
-        lines.append("    (pcbplotparams")
-        lines.append("      (layerselection 0x00010fc_ffffffff)")
-        lines.append("      (plot_on_all_layers_selection 0x0000000_00000000)")
-        lines.append("      (disableapertmacros no)")
-        lines.append("      (usegerberextensions no)")
-        lines.append("      (usegerberattributes yes)")
-        lines.append("      (usegerberadvancedattributes yes)")
-        lines.append("      (creategerberjobfile yes)")
-        lines.append("      (dashed_line_dash_ratio 12.000000)")
-        lines.append("      (dashed_line_gap_ratio 3.000000)")
-        lines.append("      (svgprecision 4)")
-        lines.append("      (plotframeref no)")
-        lines.append("      (viasonmask no)")
-        lines.append("      (mode 1)")
-        lines.append("      (useauxorigin no)")
-        lines.append("      (hpglpennumber 1)")
-        lines.append("      (hpglpenspeed 20)")
-        lines.append("      (hpglpendiameter 15.000000)")
-        lines.append("      (pdf_front_fp_property_popups yes)")
-        lines.append("      (pdf_back_fp_property_popups yes)")
-        lines.append("      (dxfpolygonmode yes)")
-        lines.append("      (dxfimperialunits yes)")
-        lines.append("      (dxfusepcbnewfont yes)")
-        lines.append("      (psnegative no)")
-        lines.append("      (psa4output no)")
-        lines.append("      (plotreference yes)")
-        lines.append("      (plotvalue yes)")
-        lines.append("      (plotfptext yes)")
-        lines.append("      (plotinvisibletext no)")
-        lines.append("      (sketchpadsonfab no)")
-        lines.append("      (subtractmaskfromsilk no)")
-        lines.append("      (outputformat 1)")
-        lines.append("      (mirror no)")
-        lines.append("      (drillshape 1)")
-        lines.append("      (scaleselection 1)")
-        lines.append('      (outputdirectory "")')
-        lines.append("    )")
-        lines.append("  )")
-        lines.append("")
+        put(
+            [
+                "  (title_block",
+                f'    (title "{self.board_name}")',
+                '    (date "2026-02-06")',
+                '    (rev "1")',
+                '    (company "Auto Generated")',
+                "  )",
+                "",
+            ]
+        )
+
+        # 层定义、Setup部分 - 静态内容
+        w(_LAYERS_TEXT)
+        w(_SETUP_TEXT)
 
         # 网络定义
-        for net_id, net_name in self.nets:
-            lines.append(f'  (net {net_id} "{net_name}")')
-        lines.append("")
+        w("".join(f'  (net {net_id} "{net_name}")\n' for net_id, net_name in self.nets))
+        w("\n")
 
         # 组件（封装）
         if self.components:
             for comp in self.components:
-                lines.extend(self._generate_footprint(comp))
-            lines.append("")
+                put(self._generate_footprint(comp))
+            w("\n")
 
         # 板框
         if hasattr(self, "board_outline") and self.board_outline:
-            lines.extend(self._generate_board_outline())
-            lines.append("")
+            put(self._generate_board_outline())
+            w("\n")
 
         # 走线
         if self.tracks:
             for track in self.tracks:
-                lines.extend(self._generate_track(track))
-            lines.append("")
+                put(self._generate_track(track))
+            w("\n")
 
         # 过孔
         if self.vias:
             for via in self.vias:
-                lines.extend(self._generate_via(via))
-            lines.append("")
+                put(self._generate_via(via))
+            w("\n")
 
         # 文件尾
-        lines.append(")")
-
-        return "\n".join(lines)
+        w(")")
 
     def _generate_uuid(self) -> str:
         """生成UUID"""
@@ -394,9 +426,8 @@ class PCBFileGenerator:
             bool: 是否成功
         """
         try:
-            content = self.generate()
-            with open(filename, "w", encoding="utf-8") as f:
-                f.write(content)
+            with open(filename, "w", encoding="utf-8", buffering=1 << 16) as f:
+                self.generate_to(f)
             logger.info(f"PCB已保存: {filename}")
             return True
         except Exception as e:
@@ -146,6 +146,8 @@ class PCBFileGeneratorV2:
 
     def __init__(self):
         self.components: List[PCBComponent] = []
+        # 位号 -> 器件 索引（同名位号以最后添加的为准）
+        self._components_by_ref: Dict[str, PCBComponent] = {}
         self.tracks: List[PCBTrack] = []
         self.vias: List[PCBVia] = []
         self.zones: List[Dict] = []
@@ -190,6 +192,7 @@ class PCBFileGeneratorV2:
     def add_component(self, component: PCBComponent):
         """添加组件"""
         self.components.append(component)
+        self._components_by_ref[component.ref] = component
         logger.debug(f"添加组件: {component.ref}")
 
     def add_track(self, track: PCBTrack):
@@ -228,13 +231,8 @@ class PCBFileGeneratorV2:
             bool: 是否成功
         """
         # 查找器件
-        comp1 = None
-        comp2 = None
-        for comp in self.components:
-            if comp.ref == comp1_ref:
-                comp1 = comp
-            if comp.ref == comp2_ref:
-                comp2 = comp
+        comp1 = self._components_by_ref.get(comp1_ref)
+        comp2 = self._components_by_ref.get(comp2_ref)
 
         if not comp1 or not comp2:
             logger.error(f"器件未找到: {comp1_ref} 或 {comp2_ref}")
@@ -5,15 +5,282 @@
 生成的文件可直接在KiCad GUI中打开。
 """
 
-from typing import List, Dict, Tuple, Optional
+from typing import (
+    Any,
+    Callable,
+    Iterator,
+    List,
+    Dict,
+    Sequence,
+    TextIO,
+    Tuple,
+    Optional,
+)
 from dataclasses import dataclass, field
+from itertools import islice
+import io
 import logging
+import os
+import sys
 import uuid
 
 logger = logging.getLogger(__name__)
 
+# numpy为可选依赖，仅用于批量连线的坐标存储
+try:
+    import numpy as np
+
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+# Python 3.10+ 的数据类使用__slots__，去掉每个实例的__dict__
+_DATACLASS_OPTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+# 库符号定义（Device:R、Device:LED、power:+5V、power:GND），内容固定
+_LIB_SYMBOLS_BLOCK = """\
+    (symbol "Device:R"
+      (pin_numbers hide)
+      (pin_names (offset 0))
+      (exclude_from_sim no)
+      (in_bom yes)
+      (on_board yes)
+      (property "Reference" "R"
+        (at 2.032 0 90)
+        (effects (font (size 1.27 1.27)))
+      )
+      (property "Value" "R"
+        (at 0 0 90)
+        (effects (font (size 1.27 1.27)))
+      )
+      (symbol "R_0_1"
+        (rectangle (start -1.016 -2.54) (end 1.016 2.54)
+          (stroke (width 0.254) (type default))
+          (fill (type none))
+        )
+      )
+      (symbol "R_1_1"
+        (pin passive line (at 0 3.81 270) (length 1.27)
+          (name "~" (effects (font (size 1.27 1.27))))
+          (number "1" (effects (font (size 1.27 1.27))))
+        )
+        (pin passive line (at 0 -3.81 90) (length 1.27)
+          (name "~" (effects (font (size 1.27 1.27))))
+          (number "2" (effects (font (size 1.27 1.27))))
+        )
+      )
+    )
+    (symbol "Device:LED"
+      (pin_numbers hide)
+      (pin_names (offset 1.016) hide)
+      (exclude_from_sim no)
+      (in_bom yes)
+      (on_board yes)
+      (property "Reference" "D"
+        (at -1.27 3.81 0)
+        (effects (font (size 1.27 1.27)) (justify right))
+      )
+      (property "Value" "LED"
+        (at -1.27 1.27 0)
+        (effects (font (size 1.27 1.27)) (justify right))
+      )
+      (symbol "LED_0_1"
+        (polyline
+          (pts
+            (xy -1.27 -1.27) (xy 1.27 0) (xy -1.27 1.27) (xy -1.27 -1.27)
+          )
+          (stroke (width 0.2032) (type default))
+          (fill (type none))
+        )
+        (polyline
+          (pts (xy -1.27 0) (xy 1.27 0))
+          (stroke (width 0) (type default))
+          (fill (type none))
+        )
+      )
+      (symbol "LED_1_1"
+        (pin passive line (at -3.81 0 0) (length 2.54)
+          (name "K" (effects (font (size 1.27 1.27))))
+          (number "2" (effects (font (size 1.27 1.27))))
+        )
+        (pin passive line (at 3.81 0 180) (length 2.54)
+          (name "A" (effects (font (size 1.27 1.27))))
+          (number "1" (effects (font (size 1.27 1.27))))
+        )
+      )
+    )
+    (symbol "power:+5V"
+      (power)
+      (pin_numbers hide)
+      (pin_names (offset 0) hide)
+      (exclude_from_sim no)
+      (in_bom yes)
+      (on_board yes)
+      (property "Reference" "#PWR"
+        (at 0 -3.81 0)
+        (effects (font (size 1.27 1.27)) hide)
+      )
+      (property "Value" "+5V"
+        (at 0 3.556 0)
+        (effects (font (size 1.27 1.27)))
+      )
+      (symbol "+5V_0_0"
+        (polyline
+          (pts (xy -0.762 1.27) (xy 0 2.54) (xy 0.762 1.27))
+          (stroke (width 0) (type default))
+          (fill (type outline))
+        )
+        (polyline
+          (pts (xy 0 0) (xy 0 2.54))
+          (stroke (width 0) (type default))
+          (fill (type none))
+        )
+      )
+      (symbol "+5V_1_0"
+        (pin power_in line (at 0 0 90) (length 0)
+          (name "+5V" (effects (font (size 1.27 1.27))))
+          (number "1" (effects (font (size 1.27 1.27))))
+        )
+      )
+    )
+    (symbol "power:GND"
+      (power)
+      (pin_numbers hide)
+      (pin_names (offset 0) hide)
+      (exclude_from_sim no)
+      (in_bom yes)
+      (on_board yes)
+      (property "Reference" "#PWR"
+        (at 0 -6.35 0)
+        (effects (font (size 1.27 1.27)) hide)
+      )
+      (property "Value" "GND"
+        (at 0 -3.81 0)
+        (effects (font (size 1.27 1.27)))
+      )
+      (symbol "GND_0_0"
+        (polyline (pts (xy 0 0) (xy 0 -1.27)) (stroke (width 0) (type default)) (fill (type none)))
+        (polyline (pts (xy -1.27 -1.27) (xy 1.27 -1.27)) (stroke (width 0) (type default)) (fill (type none)))
+        (polyline (pts (xy -0.762 -1.905) (xy 0.762 -1.905)) (stroke (width 0) (type default)) (fill (type none)))
+        (polyline (pts (xy -0.254 -2.54) (xy 0.254 -2.54)) (stroke (width 0) (type default)) (fill (type none)))
+      )
+      (symbol "GND_1_0"
+        (pin power_in line (at 0 0 90) (length 0)
+          (name "GND" (effects (font (size 1.27 1.27))))
+          (number "1" (effects (font (size 1.27 1.27))))
+        )
+      )
+    )
+"""
+
+# 重复出现的固定片段
+_EFFECTS_127 = "      (effects (font (size 1.27 1.27)))\n"
+_EFFECTS_127_LEFT = "      (effects (font (size 1.27 1.27)) (justify left))\n"
+_EFFECTS_127_HIDE = "      (effects (font (size 1.27 1.27)) hide)\n"
+_LABEL_EFFECTS = "    (effects (font (size 1.27 1.27)))\n"
+_STROKE_DEFAULT = "    (stroke (width 0) (type default))\n"
+_INSTANCE_FLAGS = "    (in_bom yes) (on_board yes) (dnp no)\n"
+_UUID_LINE = "    (uuid %s)\n"
+_PROPERTY_END = "    )\n"
+_ITEM_END = "  )\n"
+
+# 图元输出模板（%格式化，避免每次调用重复解析f-string）
+# 坐标/角度统一使用%.10g：输出紧凑（12.7而非12.700000000000001），且不损失精度
+_JUNCTION_TMPL = (
+    "  (junction (at %.10g %.10g) (diameter 0) (color 0 0 0 0)\n"
+    + _UUID_LINE
+    + _ITEM_END
+)
+
+_WIRE_TMPL = (
+    "  (wire (pts (xy %.10g %.10g) (xy %.10g %.10g))\n"
+    + _STROKE_DEFAULT
+    + _UUID_LINE
+    + _ITEM_END
+)
+
+_LABEL_TMPL = (
+    '  (label "%s" (at %.10g %.10g %.10g)\n' + _LABEL_EFFECTS + _UUID_LINE + _ITEM_END
+)
+
+_GLOBAL_LABEL_TMPL = (
+    '  (global_label "%s" (shape input)\n'
+    "    (at %.10g %.10g %.10g)\n" + _LABEL_EFFECTS + _UUID_LINE + _ITEM_END
+)
+
+_SYMBOL_HEAD_TMPL = (
+    '  (symbol (lib_id "Device:%s") (at %.10g %.10g %.10g) (unit 1)\n' + _INSTANCE_FLAGS
+)
+
+_SYMBOL_PROPS_TMPL = (
+    _UUID_LINE
+    + '    (property "Reference" "%s"\n'
+    + "      (at %.10g %.10g %.10g)\n"
+    + _EFFECTS_127_LEFT
+    + _PROPERTY_END
+    + '    (property "Value" "%s"\n'
+    + "      (at %.10g %.10g %.10g)\n"
+    + _EFFECTS_127_LEFT
+    + _PROPERTY_END
+)
+
+_POWER_SYMBOL_TMPL = (
+    '  (symbol (lib_id "power:%s") (at %.10g %.10g 0) (unit 1)\n'
+    + _INSTANCE_FLAGS
+    + _UUID_LINE
+    + '    (property "Reference" "%s"\n'
+    + "      (at %.10g %.10g 0)\n"
+    + _EFFECTS_127_HIDE
+    + _PROPERTY_END
+    + '    (property "Value" "%s"\n'
+    + "      (at %.10g %.10g 0)\n"
+    + _EFFECTS_127
+    + _PROPERTY_END
+)
+
+_PIN_TMPL = '    (pin "%s" (uuid %s))\n'
+
+# _LIB_SYMBOLS_BLOCK中各库符号的引脚表（只读，由同名符号实例共享）
+_PIN_LIBRARY: Dict[str, Tuple[Dict, ...]] = {
+    "R": ({"number": "1", "name": "~"}, {"number": "2", "name": "~"}),
+    "LED": ({"number": "1", "name": "A"}, {"number": "2", "name": "K"}),
+    "+5V": ({"number": "1", "name": "+5V"},),
+    "GND": ({"number": "1", "name": "GND"},),
+}
+
+# 批量连线超过该数量时尝试使用Numba内核（scripts/generators/_sch_fast.py）
+_FAST_WIRE_THRESHOLD = 10000
+
+# _WIRE_TMPL 按坐标和UUID切分后的固定文本（供Numba内核使用）
+_WIRE_PARTS = [
+    b"  (wire (pts (xy ",
+    b" ",
+    b") (xy ",
+    b" ",
+    b"))\n" + _STROKE_DEFAULT.encode("ascii") + b"    (uuid ",
+    b")\n" + _ITEM_END.encode("ascii"),
+]
+
+
+def _bulk_uuids(n: int) -> Iterator[str]:
+    """
+    批量生成n个UUID（版本4）
 
-@dataclass
+    一次读取16*n字节随机数并统一设置版本/变体位，
+    避免逐个调用uuid.uuid4()的开销。
+    """
+    raw = bytearray(os.urandom(16 * n))
+    for i in range(0, 16 * n, 16):
+        raw[i + 6] = (raw[i + 6] & 0x0F) | 0x40
+        raw[i + 8] = (raw[i + 8] & 0x3F) | 0x80
+    h = raw.hex()
+    for i in range(0, 32 * n, 32):
+        seg = h[i : i + 32]
+        yield f"{seg[:8]}-{seg[8:12]}-{seg[12:16]}-{seg[16:20]}-{seg[20:]}"
+
+
+@dataclass(**_DATACLASS_OPTS)
 class SCHSymbol:
     """原理图符号（器件）"""
 
@@ -26,17 +293,20 @@ class SCHSymbol:
     )  # 引脚列表 [{"number": "1", "name": "VCC"}, ...]
     rotation: float = 0.0  # 旋转角度
     mirror: bool = False  # 是否镜像
+    uuid: str = ""  # 为空时由生成器在输出前分配（不写回本对象）
+    pin_uuids: List[str] = field(default_factory=list)  # 可选，与pins一一对应
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTS)
 class SCHWire:
     """原理图连线"""
 
     start: Tuple[float, float]  # (x, y) in mm
     end: Tuple[float, float]  # (x, y) in mm
+    uuid: str = ""  # 为空时由生成器在输出前分配（不写回本对象）
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTS)
 class SCHLabel:
     """原理图标签"""
 
@@ -44,13 +314,15 @@ class SCHLabel:
     position: Tuple[float, float]
     label_type: str = "local"  # local, global, hierarchical
     rotation: float = 0.0
+    uuid: str = ""  # 为空时由生成器在输出前分配（不写回本对象）
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTS)
 class SCHJunction:
     """原理图连接点（junction）"""
 
     position: Tuple[float, float]
+    uuid: str = ""  # 为空时由生成器在输出前分配（不写回本对象）
 
 
 class SchematicFileGenerator:
@@ -63,10 +335,19 @@ class SchematicFileGenerator:
 
     def __init__(self):
         self.symbols: List[SCHSymbol] = []
+        # 连线坐标的扁平存储（x1, y1, x2, y2, ...），输出时无需逐个访问属性；
+        # 为None表示需要按self.wires重建
+        self._wires_xy: Optional[List[float]] = None
         self.wires: List[SCHWire] = []
         self.labels: List[SCHLabel] = []
         self.junctions: List[SCHJunction] = []
         self.power_symbols: List[SCHSymbol] = []
+        # 批量连线坐标 (N, 4): x1, y1, x2, y2（需要numpy）
+        self._wire_array: Optional["np.ndarray"] = None
+        self._wire_array_uuids: List[str] = []
+        # 本生成器分配的UUID：id(对象) -> (对象, UUID) / (符号, 引脚UUID列表)
+        self._uuids: Dict[int, Tuple[Any, str]] = {}
+        self._pin_uuids: Dict[int, Tuple[SCHSymbol, List[str]]] = {}
 
         # 原理图规格
         self.page_width = 210.0  # A4纸宽
@@ -74,6 +355,21 @@ class SchematicFileGenerator:
         self.schematic_name = "Untitled"
         self.schematic_uuid = self._generate_uuid()
 
+        # generate()结果缓存，add_*/set_page_properties会使其失效
+        self._dirty = True
+        self._cache: Optional[str] = None
+
+    @property
+    def wires(self) -> List[SCHWire]:
+        """连线列表"""
+        return self._wires
+
+    @wires.setter
+    def wires(self, wires: List[SCHWire]):
+        self._wires = wires
+        self._wires_xy = None
+        self._dirty = True
+
     def _generate_uuid(self) -> str:
         """生成UUID"""
         return str(uuid.uuid4())
@@ -85,358 +381,352 @@ class SchematicFileGenerator:
         self.page_width = width
         self.page_height = height
         self.schematic_name = name
+        self._dirty = True
         logger.info(f"原理图: {width}x{height}mm, 名称={name}")
 
     def add_symbol(self, symbol: SCHSymbol):
         """添加符号"""
         self.symbols.append(symbol)
-        logger.debug(f"添加符号: {symbol.ref}")
+        self._dirty = True
+        logger.debug("添加符号: %s", symbol.ref)
 
     def add_wire(self, wire: SCHWire):
         """添加连线"""
-        self.wires.append(wire)
-        logger.debug(f"添加连线")
+        self._wires.append(wire)
+        if self._wires_xy is not None:
+            self._wires_xy += (*wire.start, *wire.end)
+        self._dirty = True
+        logger.debug("添加连线")
+
+    def add_wires_bulk(self, starts, ends):
+        """
+        批量添加连线
+
+        坐标以数组形式保存，输出时一次性格式化，适合路由器等
+        一次产生大量连线的场景。numpy不可用时退化为逐条add_wire。
+
+        Args:
+            starts: 起点坐标，形如 (N, 2) 的数组或序列
+            ends: 终点坐标，形如 (N, 2) 的数组或序列
+        """
+        if not NUMPY_AVAILABLE:
+            for start, end in zip(starts, ends):
+                self.add_wire(SCHWire(start=tuple(start), end=tuple(end)))
+            return
+
+        coords = np.hstack(
+            [
+                np.asarray(starts, dtype=float).reshape(-1, 2),
+                np.asarray(ends, dtype=float).reshape(-1, 2),
+            ]
+        )
+        if self._wire_array is None:
+            self._wire_array = coords
+        else:
+            self._wire_array = np.vstack([self._wire_array, coords])
+        self._dirty = True
+        logger.debug("批量添加连线: %d", len(coords))
 
     def add_label(self, label: SCHLabel):
         """添加标签"""
         self.labels.append(label)
-        logger.debug(f"添加标签: {label.text}")
+        self._dirty = True
+        logger.debug("添加标签: %s", label.text)
 
     def add_junction(self, junction: SCHJunction):
         """添加连接点"""
         self.junctions.append(junction)
+        self._dirty = True
 
     def add_power_symbol(self, symbol: SCHSymbol):
         """添加电源符号"""
         self.power_symbols.append(symbol)
+        self._dirty = True
+
+    @staticmethod
+    def _intern_pins(symbol: SCHSymbol) -> Sequence[Dict]:
+        """
+        返回符号实际输出的引脚表
+
+        未指定引脚的库符号使用_PIN_LIBRARY中的共享引脚表；
+        symbol.pins本身保持为调用方的列表，不会被替换。
+        """
+        return symbol.pins or _PIN_LIBRARY.get(symbol.name, ())
+
+    def _assign_uuids(self):
+        """
+        为尚未分配UUID的对象、引脚和批量连线统一分配UUID
+
+        所需数量一次性由_bulk_uuids生成。分配结果按对象id保存在本生成器内，
+        不写回调用方的对象：同一对象加入多个生成器时各自得到不同的UUID，
+        同一生成器重复输出时结果一致。调用方显式指定的UUID优先使用。
+        """
+        assigned = self._uuids
+        items = [
+            item
+            for group in (
+                self.symbols,
+                self.power_symbols,
+                self.wires,
+                self.labels,
+                self.junctions,
+            )
+            for item in group
+            if not item.uuid and assigned.get(id(item), (None,))[0] is not item
+        ]
+        pin_gaps = []
+        for symbol in (*self.symbols, *self.power_symbols):
+            missing = len(self._intern_pins(symbol)) - len(
+                self._symbol_pin_uuids(symbol)
+            )
+            if missing > 0:
+                pin_gaps.append((symbol, missing))
+        bulk_missing = self._bulk_wire_count() - len(self._wire_array_uuids)
+
+        total = len(items) + sum(n for _, n in pin_gaps) + bulk_missing
+        if total == 0:
+            return
+        ids = _bulk_uuids(total)
+        for item in items:
+            # 同时保存对象引用，保证其id在本生成器存活期间不被复用
+            assigned[id(item)] = (item, next(ids))
+        for symbol, missing in pin_gaps:
+            entry = self._pin_uuids.get(id(symbol))
+            if entry is None or entry[0] is not symbol:
+                entry = self._pin_uuids[id(symbol)] = (symbol, [])
+            entry[1].extend(islice(ids, missing))
+        self._wire_array_uuids.extend(ids)
+
+    def _uuid(self, item) -> str:
+        """对象的UUID：调用方指定的优先，否则为本生成器分配的"""
+        return item.uuid or self._uuids[id(item)][1]
+
+    def _symbol_pin_uuids(self, symbol: SCHSymbol) -> List[str]:
+        """符号的引脚UUID：调用方指定的在前，不足部分为本生成器分配的"""
+        entry = self._pin_uuids.get(id(symbol))
+        if entry is None or entry[0] is not symbol:
+            return symbol.pin_uuids
+        return symbol.pin_uuids + entry[1]
 
     def generate(self) -> str:
         """
         生成.kicad_sch文件内容
 
+        内容未变化（期间没有调用add_*/set_page_properties）时直接返回
+        上次的结果。直接修改symbols/wires等列表后需调用invalidate()。
+
         Returns:
             str: KiCad S-expression格式的内容
         """
-        lines = []
+        if not self._dirty and self._cache is not None:
+            return self._cache
+        buf = io.StringIO()
+        self._write(buf.write)
+        self._cache = buf.getvalue()
+        self._dirty = False
+        return self._cache
+
+    def invalidate(self):
+        """使generate()缓存失效（包括连线坐标缓存）"""
+        self._wires_xy = None
+        self._dirty = True
+
+    def generate_to(self, fp: TextIO):
+        """
+        将.kicad_sch文件内容直接写入文本文件对象
+
+        Args:
+            fp: 已打开的文本文件对象（需支持write）
+        """
+        if not self._dirty and self._cache is not None:
+            fp.write(self._cache)
+        else:
+            self._write(fp.write)
+
+    def _write(self, w: Callable[[str], object]):
+        """按顺序输出全部S-expression片段"""
+        self._assign_uuids()
 
         # 文件头 - 修正：添加uuid
-        lines.append('(kicad_sch (version 20240108) (generator "pcb-nlp-skill")')
-        lines.append(f"  (uuid {self.schematic_uuid})")
-        lines.append('  (paper "A4")')
-        lines.append("")
+        w('(kicad_sch (version 20240108) (generator "pcb-nlp-skill")\n')
+        w(f"  (uuid {self.schematic_uuid})\n")
+        w('  (paper "A4")\n')
+        w("\n")
 
         # 标题块
-        lines.append("  (title_block")
-        lines.append(f'    (title "{self.schematic_name}")')
-        lines.append('    (date "2026-02-06")')
-        lines.append('    (rev "1")')
-        lines.append('    (company "Auto Generated")')
-        lines.append("  )")
-        lines.append("")
+        w("  (title_block\n")
+        w(f'    (title "{self.schematic_name}")\n')
+        w('    (date "2026-02-06")\n')
+        w('    (rev "1")\n')
+        w('    (company "Auto Generated")\n')
+        w("  )\n")
+        w("\n")
 
         # 库符号定义
-        lines.append("  (lib_symbols")
-        lines.extend(self._generate_lib_symbols())
-        lines.append("  )")
-        lines.append("")
+        w("  (lib_symbols\n")
+        w(_LIB_SYMBOLS_BLOCK)
+        w("  )\n")
+        w("\n")
 
         # 连接点
         for junction in self.junctions:
-            lines.extend(self._generate_junction(junction))
+            self._generate_junction(junction, w)
         if self.junctions:
-            lines.append("")
+            w("\n")
 
         # 连线
-        for wire in self.wires:
-            lines.extend(self._generate_wire(wire))
-        if self.wires:
-            lines.append("")
+        self._generate_wires(w)
+        if self._wire_array is not None:
+            self._generate_bulk_wires(w)
+        if self.wires or self._bulk_wire_count():
+            w("\n")
 
         # 标签
         for label in self.labels:
-            lines.extend(self._generate_label(label))
+            self._generate_label(label, w)
         if self.labels:
-            lines.append("")
+            w("\n")
 
         # 符号实例
         for symbol in self.symbols:
-            lines.extend(self._generate_symbol_instance(symbol))
+            self._generate_symbol_instance(symbol, w)
         if self.symbols:
-            lines.append("")
+            w("\n")
 
         # 电源符号实例
         for symbol in self.power_symbols:
-            lines.extend(self._generate_power_symbol_instance(symbol))
+            self._generate_power_symbol_instance(symbol, w)
         if self.power_symbols:
-            lines.append("")
+            w("\n")
 
         # 根工作表实例 - 修正：添加必需的sheet_instances
-        lines.append("  (sheet_instances")
-        lines.append('    (path "/" (page "1"))')
-        lines.append("  )")
+        w("  (sheet_instances\n")
+        w('    (path "/" (page "1"))\n')
+        w("  )\n")
 
         # 文件尾
-        lines.append(")")
-
-        return "\n".join(lines)
-
-    def _generate_lib_symbols(self) -> List[str]:
-        """生成库符号定义"""
-        lines = []
-
-        # 电阻符号
-        lines.append('    (symbol "Device:R"')
-        lines.append("      (pin_numbers hide)")
-        lines.append("      (pin_names (offset 0))")
-        lines.append("      (exclude_from_sim no)")
-        lines.append("      (in_bom yes)")
-        lines.append("      (on_board yes)")
-        lines.append('      (property "Reference" "R"')
-        lines.append("        (at 2.032 0 90)")
-        lines.append("        (effects (font (size 1.27 1.27)))")
-        lines.append("      )")
-        lines.append('      (property "Value" "R"')
-        lines.append("        (at 0 0 90)")
-        lines.append("        (effects (font (size 1.27 1.27)))")
-        lines.append("      )")
-        lines.append('      (symbol "R_0_1"')
-        lines.append("        (rectangle (start -1.016 -2.54) (end 1.016 2.54)")
-        lines.append("          (stroke (width 0.254) (type default))")
-        lines.append("          (fill (type none))")
-        lines.append("        )")
-        lines.append("      )")
-        lines.append('      (symbol "R_1_1"')
-        lines.append("        (pin passive line (at 0 3.81 270) (length 1.27)")
-        lines.append('          (name "~" (effects (font (size 1.27 1.27))))')
-        lines.append('          (number "1" (effects (font (size 1.27 1.27))))')
-        lines.append("        )")
-        lines.append("        (pin passive line (at 0 -3.81 90) (length 1.27)")
-        lines.append('          (name "~" (effects (font (size 1.27 1.27))))')
-        lines.append('          (number "2" (effects (font (size 1.27 1.27))))')
-        lines.append("        )")
-        lines.append("      )")
-        lines.append("    )")
-
-        # LED符号
-        lines.append('    (symbol "Device:LED"')
-        lines.append("      (pin_numbers hide)")
-        lines.append("      (pin_names (offset 1.016) hide)")
-        lines.append("      (exclude_from_sim no)")
-        lines.append("      (in_bom yes)")
-        lines.append("      (on_board yes)")
-        lines.append('      (property "Reference" "D"')
-        lines.append("        (at -1.27 3.81 0)")
-        lines.append("        (effects (font (size 1.27 1.27)) (justify right))")
-        lines.append("      )")
-        lines.append('      (property "Value" "LED"')
-        lines.append("        (at -1.27 1.27 0)")
-        lines.append("        (effects (font (size 1.27 1.27)) (justify right))")
-        lines.append("      )")
-        lines.append('      (symbol "LED_0_1"')
-        lines.append("        (polyline")
-        lines.append("          (pts")
-        lines.append(
-            "            (xy -1.27 -1.27) (xy 1.27 0) (xy -1.27 1.27) (xy -1.27 -1.27)"
-        )
-        lines.append("          )")
-        lines.append("          (stroke (width 0.2032) (type default))")
-        lines.append("          (fill (type none))")
-        lines.append("        )")
-        lines.append("        (polyline")
-        lines.append("          (pts (xy -1.27 0) (xy 1.27 0))")
-        lines.append("          (stroke (width 0) (type default))")
-        lines.append("          (fill (type none))")
-        lines.append("        )")
-        lines.append("      )")
-        lines.append('      (symbol "LED_1_1"')
-        lines.append("        (pin passive line (at -3.81 0 0) (length 2.54)")
-        lines.append('          (name "K" (effects (font (size 1.27 1.27))))')
-        lines.append('          (number "2" (effects (font (size 1.27 1.27))))')
-        lines.append("        )")
-        lines.append("        (pin passive line (at 3.81 0 180) (length 2.54)")
-        lines.append('          (name "A" (effects (font (size 1.27 1.27))))')
-        lines.append('          (number "1" (effects (font (size 1.27 1.27))))')
-        lines.append("        )")
-        lines.append("      )")
-        lines.append("    )")
-
-        # VCC电源符号
-        lines.append('    (symbol "power:+5V"')
-        lines.append("      (power)")
-        lines.append("      (pin_numbers hide)")
-        lines.append("      (pin_names (offset 0) hide)")
-        lines.append("      (exclude_from_sim no)")
-        lines.append("      (in_bom yes)")
-        lines.append("      (on_board yes)")
-        lines.append('      (property "Reference" "#PWR"')
-        lines.append("        (at 0 -3.81 0)")
-        lines.append("        (effects (font (size 1.27 1.27)) hide)")
-        lines.append("      )")
-        lines.append('      (property "Value" "+5V"')
-        lines.append("        (at 0 3.556 0)")
-        lines.append("        (effects (font (size 1.27 1.27)))")
-        lines.append("      )")
-        lines.append('      (symbol "+5V_0_0"')
-        lines.append("        (polyline")
-        lines.append("          (pts (xy -0.762 1.27) (xy 0 2.54) (xy 0.762 1.27))")
-        lines.append("          (stroke (width 0) (type default))")
-        lines.append("          (fill (type outline))")
-        lines.append("        )")
-        lines.append("        (polyline")
-        lines.append("          (pts (xy 0 0) (xy 0 2.54))")
-        lines.append("          (stroke (width 0) (type default))")
-        lines.append("          (fill (type none))")
-        lines.append("        )")
-        lines.append("      )")
-        lines.append('      (symbol "+5V_1_0"')
-        lines.append("        (pin power_in line (at 0 0 90) (length 0)")
-        lines.append('          (name "+5V" (effects (font (size 1.27 1.27))))')
-        lines.append('          (number "1" (effects (font (size 1.27 1.27))))')
-        lines.append("        )")
-        lines.append("      )")
-        lines.append("    )")
-
-        # GND电源符号
-        lines.append('    (symbol "power:GND"')
-        lines.append("      (power)")
-        lines.append("      (pin_numbers hide)")
-        lines.append("      (pin_names (offset 0) hide)")
-        lines.append("      (exclude_from_sim no)")
-        lines.append("      (in_bom yes)")
-        lines.append("      (on_board yes)")
-        lines.append('      (property "Reference" "#PWR"')
-        lines.append("        (at 0 -6.35 0)")
-        lines.append("        (effects (font (size 1.27 1.27)) hide)")
-        lines.append("      )")
-        lines.append('      (property "Value" "GND"')
-        lines.append("        (at 0 -3.81 0)")
-        lines.append("        (effects (font (size 1.27 1.27)))")
-        lines.append("      )")
-        lines.append('      (symbol "GND_0_0"')
-        lines.append(
-            "        (polyline (pts (xy 0 0) (xy 0 -1.27)) (stroke (width 0) (type default)) (fill (type none)))"
-        )
-        lines.append(
-            "        (polyline (pts (xy -1.27 -1.27) (xy 1.27 -1.27)) (stroke (width 0) (type default)) (fill (type none)))"
-        )
-        lines.append(
-            "        (polyline (pts (xy -0.762 -1.905) (xy 0.762 -1.905)) (stroke (width 0) (type default)) (fill (type none)))"
-        )
-        lines.append(
-            "        (polyline (pts (xy -0.254 -2.54) (xy 0.254 -2.54)) (stroke (width 0) (type default)) (fill (type none)))"
-        )
-        lines.append("      )")
-        lines.append('      (symbol "GND_1_0"')
-        lines.append("        (pin power_in line (at 0 0 90) (length 0)")
-        lines.append('          (name "GND" (effects (font (size 1.27 1.27))))')
-        lines.append('          (number "1" (effects (font (size 1.27 1.27))))')
-        lines.append("        )")
-        lines.append("      )")
-        lines.append("    )")
-
-        return lines
-
-    def _generate_junction(self, junction: SCHJunction) -> List[str]:
+        w(")")
+
+    def _generate_junction(self, junction: SCHJunction, w: Callable[[str], object]):
         """生成连接点"""
         x, y = junction.position
-        lines = [
-            f"  (junction (at {x} {y}) (diameter 0) (color 0 0 0 0)",
-            f"    (uuid {self._generate_uuid()})",
-            f"  )",
-        ]
-        return lines
+        w(_JUNCTION_TMPL % (x, y, self._uuid(junction)))
 
-    def _generate_wire(self, wire: SCHWire) -> List[str]:
+    def _generate_wires(self, w: Callable[[str], object]):
         """生成连线 - 修正：使用正确的wire格式"""
-        x1, y1 = wire.start
-        x2, y2 = wire.end
-
-        lines = [
-            f"  (wire (pts (xy {x1} {y1}) (xy {x2} {y2}))",
-            f"    (stroke (width 0) (type default))",
-            f"    (uuid {self._generate_uuid()})",
-            f"  )",
-        ]
-        return lines
+        xy = self._wires_xy
+        if xy is None or len(xy) != 4 * len(self.wires):
+            # wires被重新赋值、调用过invalidate()或列表被直接修改，按对象重建坐标
+            xy = self._wires_xy = [c for wr in self.wires for c in (*wr.start, *wr.end)]
+        uid = self._uuid
+        w(
+            "".join(
+                _WIRE_TMPL % (xy[i], xy[i + 1], xy[i + 2], xy[i + 3], uid(wr))
+                for i, wr in zip(range(0, len(xy), 4), self.wires)
+            )
+        )
 
-    def _generate_label(self, label: SCHLabel) -> List[str]:
+    def _bulk_wire_count(self) -> int:
+        """批量连线数量"""
+        return 0 if self._wire_array is None else len(self._wire_array)
+
+    def _generate_bulk_wires(self, w: Callable[[str], object]):
+        """输出批量连线（格式与_generate_wires一致）"""
+        n = self._bulk_wire_count()
+        if n == 0:
+            return
+        if n >= _FAST_WIRE_THRESHOLD:
+            from . import _sch_fast
+
+            if _sch_fast.NUMBA_AVAILABLE and _sch_fast.can_emit(self._wire_array):
+                w(
+                    _sch_fast.emit_wires(
+                        self._wire_array, self._wire_array_uuids, _WIRE_PARTS
+                    ).decode("ascii")
+                )
+                return
+
+        # 逐行套用与_generate_wires相同的%模板；np.char逐元素调用Python，反而更慢
+        w(
+            "".join(
+                _WIRE_TMPL % (*row, uid)
+                for row, uid in zip(self._wire_array.tolist(), self._wire_array_uuids)
+            )
+        )
+
+    def _generate_label(self, label: SCHLabel, w: Callable[[str], object]):
         """生成标签"""
         x, y = label.position
+        tmpl = _GLOBAL_LABEL_TMPL if label.label_type == "global" else _LABEL_TMPL
+        w(tmpl % (label.text, x, y, label.rotation, self._uuid(label)))
 
-        if label.label_type == "global":
-            lines = [
-                f'  (global_label "{label.text}" (shape input)',
-                f"    (at {x} {y} {label.rotation})",
-                f"    (effects (font (size 1.27 1.27)))",
-                f"    (uuid {self._generate_uuid()})",
-                f"  )",
-            ]
-        else:
-            lines = [
-                f'  (label "{label.text}" (at {x} {y} {label.rotation})',
-                f"    (effects (font (size 1.27 1.27)))",
-                f"    (uuid {self._generate_uuid()})",
-                f"  )",
-            ]
-        return lines
-
-    def _generate_symbol_instance(self, symbol: SCHSymbol) -> List[str]:
+    def _generate_symbol_instance(self, symbol: SCHSymbol, w: Callable[[str], object]):
         """生成符号实例 - 修正：使用正确的格式，毫米而非纳米"""
         x, y = symbol.position
+        rot = symbol.rotation
 
-        lines = [
-            f'  (symbol (lib_id "Device:{symbol.name}") (at {x} {y} {symbol.rotation}) (unit 1)',
-            f"    (in_bom yes) (on_board yes) (dnp no)",
-        ]
-
+        w(_SYMBOL_HEAD_TMPL % (symbol.name, x, y, rot))
         if symbol.mirror:
-            lines.append("    (mirror y)")
-
-        lines.append(f"    (uuid {self._generate_uuid()})")
-
-        # 属性
-        lines.append(f'    (property "Reference" "{symbol.ref}"')
-        lines.append(f"      (at {x + 1.27} {y - 1.27} {symbol.rotation})")
-        lines.append("      (effects (font (size 1.27 1.27)) (justify left))")
-        lines.append("    )")
-
-        lines.append(f'    (property "Value" "{symbol.value}"')
-        lines.append(f"      (at {x + 1.27} {y + 1.27} {symbol.rotation})")
-        lines.append("      (effects (font (size 1.27 1.27)) (justify left))")
-        lines.append("    )")
+            w("    (mirror y)\n")
+        w(
+            _SYMBOL_PROPS_TMPL
+            % (
+                self._uuid(symbol),
+                symbol.ref,
+                x + 1.27,
+                y - 1.27,
+                rot,
+                symbol.value,
+                x + 1.27,
+                y + 1.27,
+                rot,
+            )
+        )
 
         # 引脚
-        for pin in symbol.pins:
-            lines.append(f'    (pin "{pin["number"]}" (uuid {self._generate_uuid()}))')
+        pins = self._intern_pins(symbol)
+        w(
+            "".join(
+                _PIN_TMPL % (pin["number"], pin_uuid)
+                for pin, pin_uuid in zip(pins, self._symbol_pin_uuids(symbol))
+            )
+        )
 
-        lines.append("  )")
-        return lines
+        w(_ITEM_END)
 
-    def _generate_power_symbol_instance(self, symbol: SCHSymbol) -> List[str]:
+    def _generate_power_symbol_instance(
+        self, symbol: SCHSymbol, w: Callable[[str], object]
+    ):
         """生成电源符号实例"""
         x, y = symbol.position
         power_name = symbol.name
 
-        lines = [
-            f'  (symbol (lib_id "power:{power_name}") (at {x} {y} 0) (unit 1)',
-            f"    (in_bom yes) (on_board yes) (dnp no)",
-            f"    (uuid {self._generate_uuid()})",
-            f'    (property "Reference" "{symbol.ref}"',
-            f"      (at {x} {y - 3.81} 0)",
-            "      (effects (font (size 1.27 1.27)) hide)",
-            "    )",
-            f'    (property "Value" "{power_name}"',
-            f"      (at {x} {y - 1.27} 0)",
-            "      (effects (font (size 1.27 1.27)))",
-            "    )",
-        ]
+        w(
+            _POWER_SYMBOL_TMPL
+            % (
+                power_name,
+                x,
+                y,
+                self._uuid(symbol),
+                symbol.ref,
+                x,
+                y - 3.81,
+                power_name,
+                x,
+                y - 1.27,
+            )
+        )
 
         # 引脚
-        for pin in symbol.pins:
-            lines.append(f'    (pin "{pin["number"]}" (uuid {self._generate_uuid()}))')
+        pins = self._intern_pins(symbol)
+        w(
+            "".join(
+                _PIN_TMPL % (pin["number"], pin_uuid)
+                for pin, pin_uuid in zip(pins, self._symbol_pin_uuids(symbol))
+            )
+        )
 
-        lines.append("  )")
-        return lines
+        w(_ITEM_END)
 
     def save(self, filename: str) -> bool:
         """
@@ -449,9 +739,8 @@ class SchematicFileGenerator:
             bool: 是否成功
         """
         try:
-            content = self.generate()
-            with open(filename, "w", encoding="utf-8") as f:
-                f.write(content)
+            with open(filename, "w", encoding="utf-8", buffering=1 << 16) as f:
+                self.generate_to(f)
             logger.info(f"原理图已保存: {filename}")
             return True
         except Exception as e:
@@ -500,6 +500,9 @@ class SchematicFileGeneratorV2:
         self.wires: List[SCHWireV2] = []
         self.connections: List[SCHConnection] = []
         self.power_symbols: List[SCHSymbolV2] = []
+        # 位号 -> 符号 索引（同名位号以最先添加的为准，普通符号优先于电源符号）
+        self._symbols_by_ref: Dict[str, SCHSymbolV2] = {}
+        self._power_by_ref: Dict[str, SCHSymbolV2] = {}
 
         self.page_width = 210.0
         self.page_height = 297.0
@@ -517,11 +520,13 @@ class SchematicFileGeneratorV2:
     def add_symbol(self, symbol: SCHSymbolV2):
         """添加符号"""
         self.symbols.append(symbol)
+        self._symbols_by_ref.setdefault(symbol.ref, symbol)
         logger.debug(f"添加符号: {symbol.ref}")
 
     def add_power_symbol(self, symbol: SCHSymbolV2):
         """添加电源符号"""
         self.power_symbols.append(symbol)
+        self._power_by_ref.setdefault(symbol.ref, symbol)
 
     def add_wire(self, wire: SCHWireV2):
         """添加连线"""
@@ -588,13 +593,10 @@ class SchematicFileGeneratorV2:
 
     def _find_symbol(self, ref: str) -> Optional[SCHSymbolV2]:
         """查找符号"""
-        for sym in self.symbols:
-            if sym.ref == ref:
-                return sym
-        for sym in self.power_symbols:
-            if sym.ref == ref:
-                return sym
-        return None
+        sym = self._symbols_by_ref.get(ref)
+        if sym is None:
+            sym = self._power_by_ref.get(ref)
+        return sym
 
     def _find_pin(self, symbol: SCHSymbolV2, pin_num: str) -> Optional[SCHPin]:
         """查找引脚"""
@@ -17,25 +17,101 @@ import sys
 import os
 import json
 import logging
+import importlib.util
+from collections import defaultdict
+from contextlib import contextmanager
 from typing import List, Dict, Tuple, Optional
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
+
+try:
+    import numpy as np
+
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
 
 # 配置日志
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# 尝试导入KiCad的pcbnew模块
-try:
-    import pcbnew
-
-    KICAD_AVAILABLE = True
-    logger.info("KiCad pcbnew 模块加载成功")
-except ImportError:
-    KICAD_AVAILABLE = False
+# 只探测KiCad的pcbnew模块是否存在，真正导入推迟到创建 KiCadAPI 时
+# （pcbnew 是体积很大的SWIG模块，仅使用数据类时无需加载）
+KICAD_AVAILABLE = importlib.util.find_spec("pcbnew") is not None
+if not KICAD_AVAILABLE:
     logger.warning("KiCad pcbnew 模块不可用，将使用模拟模式")
 
+_pcbnew = None
+
+# 层名 -> 层ID，导入pcbnew后填充
+_LAYER_MAP: Dict[str, int] = {}
+
+_TECH_LAYER_NAMES = (
+    "F.Adhes",
+    "B.Adhes",
+    "F.Paste",
+    "B.Paste",
+    "F.SilkS",
+    "B.SilkS",
+    "F.Mask",
+    "B.Mask",
+    "Dwgs.User",
+    "Cmts.User",
+    "Eco1.User",
+    "Eco2.User",
+    "Edge.Cuts",
+    "Margin",
+    "F.CrtYd",
+    "B.CrtYd",
+    "F.Fab",
+    "B.Fab",
+)
+
+
+def _build_layer_map(pcbnew) -> Dict[str, int]:
+    """按 pcbnew 的层常量建立层名查找表（常量名即层名把 '.' 换成 '_'）"""
+    names = ("F.Cu", "B.Cu") + tuple(f"In{i}.Cu" for i in range(1, 31))
+    layer_map = {}
+    for name in names + _TECH_LAYER_NAMES:
+        layer_id = getattr(pcbnew, name.replace(".", "_"), None)
+        if layer_id is not None:
+            layer_map[name] = layer_id
+    return layer_map
+
+
+def _get_pcbnew():
+    """导入并缓存pcbnew模块，导入失败时返回None并切换到模拟模式"""
+    global _pcbnew, KICAD_AVAILABLE
+
+    if _pcbnew is None and KICAD_AVAILABLE:
+        try:
+            import pcbnew
+
+            _pcbnew = pcbnew
+            _LAYER_MAP.update(_build_layer_map(pcbnew))
+            logger.info("KiCad pcbnew 模块加载成功")
+        except ImportError:
+            KICAD_AVAILABLE = False
+            logger.warning("KiCad pcbnew 模块不可用，将使用模拟模式")
+    return _pcbnew
+
+
+# KiCad内部单位：1 mm = 1,000,000 nm
+_IU_PER_MM = 1_000_000
 
-@dataclass
+
+def mm(v: float) -> int:
+    """毫米转KiCad内部单位（纳米），与 pcbnew.FromMM 结果一致但不经过SWIG调用"""
+    return int(round(v * _IU_PER_MM))
+
+
+# 优先布线的关键网络
+_PRIORITY_NETS = ("+12V", "GND", "VCC", "HV_PLUS")
+
+# Python 3.10+ 的数据类使用__slots__，去掉每个实例的__dict__
+_DATACLASS_OPTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(**_DATACLASS_OPTS)
 class KiCadComponent:
     """KiCad元件封装"""
 
@@ -46,8 +122,19 @@ class KiCadComponent:
     rotation: float = 0.0
     layer: str = "F.Cu"
 
+    def to_dict(self) -> Dict:
+        """转换为字典（字段均为扁平类型，无需 asdict 的递归拷贝）"""
+        return {
+            "reference": self.reference,
+            "footprint": self.footprint,
+            "value": self.value,
+            "position": self.position,
+            "rotation": self.rotation,
+            "layer": self.layer,
+        }
+
 
-@dataclass
+@dataclass(**_DATACLASS_OPTS)
 class KiCadNet:
     """KiCad网络"""
 
@@ -55,6 +142,89 @@ class KiCadNet:
     netcode: int
     pads: List[Tuple[str, str]]  # (reference, pad_number)
 
+    def to_dict(self) -> Dict:
+        """转换为字典"""
+        return {"name": self.name, "netcode": self.netcode, "pads": list(self.pads)}
+
+
+def _classify_unmatched(ref: str, value: str) -> str:
+    """前缀未命中专用规则时的归类（名称含RECT的器件归入整流组）"""
+    return "rectifier" if "RECT" in ref else "other"
+
+
+def _classify_j(ref: str, value: str) -> str:
+    return "power_input" if "IN" in ref else _classify_unmatched(ref, value)
+
+
+def _classify_t(ref: str, value: str) -> str:
+    return "rectifier" if "RECT" in ref else "transformer"
+
+
+def _classify_u(ref: str, value: str) -> str:
+    if "RECT" in ref:
+        return "rectifier"
+    if "VIPER" in value.upper():
+        return "power_stage"
+    if ref.startswith(("U2", "U3")):
+        return "feedback"
+    return "other"
+
+
+def _classify_c(ref: str, value: str) -> str:
+    if "RECT" in ref:
+        return "rectifier"
+    if "400V" in value:
+        return "filter"
+    if "25V" in value:
+        return "output"
+    return "other"
+
+
+def _classify_d(ref: str, value: str) -> str:
+    return "rectifier" if "RECT" in ref else "output"
+
+
+def _classify_r(ref: str, value: str) -> str:
+    return "rectifier" if "RECT" in ref else "feedback"
+
+
+# 位号前缀 -> 分组规则，先查两字符前缀再查单字符前缀
+_PREFIX_DISPATCH = {
+    "RV": lambda ref, value: "protection",
+    "BR": lambda ref, value: "rectifier",
+    "F": lambda ref, value: "protection",
+    "J": _classify_j,
+    "T": _classify_t,
+    "U": _classify_u,
+    "C": _classify_c,
+    "D": _classify_d,
+    "R": _classify_r,
+}
+
+
+def _classify_component(ref: str, value: str) -> str:
+    """
+    按位号前缀归类元件
+
+    Args:
+        ref: 大写后的位号
+        value: 元件值
+    """
+    rule = _PREFIX_DISPATCH.get(ref[:2]) or _PREFIX_DISPATCH.get(ref[:1])
+    if rule is None:
+        return _classify_unmatched(ref, value)
+    return rule(ref, value)
+
+
+def _positions_soa(components: List[KiCadComponent]):
+    """把元件列表转换为 (位号列表, (N, 2) 坐标数组)，无numpy时坐标为元组列表"""
+    refs = [c.reference for c in components]
+    if NUMPY_AVAILABLE:
+        xy = np.array([c.position for c in components], dtype=np.float64).reshape(-1, 2)
+    else:
+        xy = [c.position for c in components]
+    return refs, xy
+
 
 class KiCadAPI:
     """
@@ -72,8 +242,27 @@ class KiCadAPI:
         """
         self.board = None
         self.board_path = board_path
-
-        if KICAD_AVAILABLE:
+        # 位号 -> 封装 索引，避免每次放置都在C++侧线性查找
+        self._fp_index: Optional[Dict[str, "pcbnew.FOOTPRINT"]] = None
+        # get_nets 结果缓存，板子修改后置 _dirty 重新生成
+        self._nets_cache: Optional[List[KiCadNet]] = None
+        self._dirty = True
+        # 网络名 -> 网络 缓存
+        self._net_cache: Optional[Dict[str, "pcbnew.NETINFO_ITEM"]] = None
+        # 批量布线嵌套深度，以及是否有待重建的连通性
+        self._bulk_depth = 0
+        self._connectivity_stale = False
+        # 元件坐标的结构数组（SoA）：位号列表 + (N, 2) 坐标数组，供批量距离计算
+        self._refs: List[str] = []
+        self._pos_xy = None
+
+        self._pn = _get_pcbnew()
+        pcbnew = self._pn
+
+        # 走线端点用的复用向量（SetStart/SetEnd 会复制坐标值）
+        self._scratch_v = pcbnew.VECTOR2I(0, 0) if pcbnew is not None else None
+
+        if pcbnew is not None:
             if board_path and os.path.exists(board_path):
                 self.board = pcbnew.LoadBoard(board_path)
                 logger.info(f"加载PCB: {board_path}")
@@ -94,10 +283,14 @@ class KiCadAPI:
         if not self.board or not KICAD_AVAILABLE:
             return components
 
+        pcbnew = self._pn
+        fp_index = {}
         for footprint in self.board.GetFootprints():
+            reference = footprint.GetReference()
+            fp_index[reference] = footprint
             pos = footprint.GetPosition()
             comp = KiCadComponent(
-                reference=footprint.GetReference(),
+                reference=reference,
                 footprint=footprint.GetFPID().GetLibItemName(),
                 value=footprint.GetValue(),
                 position=(pcbnew.ToMM(pos.x), pcbnew.ToMM(pos.y)),
@@ -106,8 +299,108 @@ class KiCadAPI:
             )
             components.append(comp)
 
+        # 顺带刷新封装索引和坐标数组
+        self._fp_index = fp_index
+        self._refs, self._pos_xy = _positions_soa(components)
         return components
 
+    def _positions(self, components: Optional[List[KiCadComponent]] = None):
+        """返回 (位号列表, 坐标数组)，给定 components 时基于它构建"""
+        if components is not None:
+            return _positions_soa(components)
+        if self._pos_xy is None:
+            self.get_components()
+        if self._pos_xy is None:
+            return [], []
+        return self._refs, self._pos_xy
+
+    def find_components_near(
+        self,
+        x: float,
+        y: float,
+        radius: float,
+        components: Optional[List[KiCadComponent]] = None,
+    ) -> List[str]:
+        """
+        查找与 (x, y) 距离小于 radius 的元件
+
+        Args:
+            x, y: 查询点（mm）
+            radius: 半径（mm）
+            components: 元件快照，None则使用当前板子
+        """
+        refs, xy = self._positions(components)
+        if not refs:
+            return []
+
+        if NUMPY_AVAILABLE:
+            d2 = ((xy - (x, y)) ** 2).sum(axis=1)
+            return [refs[i] for i in np.flatnonzero(d2 < radius * radius)]
+
+        r2 = radius * radius
+        return [
+            ref for ref, (px, py) in zip(refs, xy) if (px - x) ** 2 + (py - y) ** 2 < r2
+        ]
+
+    def find_close_pairs(
+        self, margin: float, components: Optional[List[KiCadComponent]] = None
+    ) -> List[Tuple[str, str]]:
+        """
+        查找间距不超过 margin 的元件对
+
+        有 scipy 时使用 cKDTree.query_pairs，否则按x排序后扫描。
+
+        Args:
+            margin: 间距阈值（mm）
+            components: 元件快照，None则使用当前板子
+        """
+        refs, xy = self._positions(components)
+        if len(refs) < 2:
+            return []
+
+        try:
+            from scipy.spatial import cKDTree
+        except ImportError:
+            cKDTree = None
+
+        if cKDTree is not None and NUMPY_AVAILABLE:
+            pairs = sorted(cKDTree(xy).query_pairs(r=margin))
+        else:
+            points = [(float(px), float(py)) for px, py in xy]
+            order = sorted(range(len(points)), key=lambda i: points[i][0])
+            m2 = margin * margin
+            pairs = []
+            for k, i in enumerate(order):
+                xi, yi = points[i]
+                for j in order[k + 1 :]:
+                    dx = points[j][0] - xi
+                    if dx > margin:
+                        break
+                    dy = points[j][1] - yi
+                    if dx * dx + dy * dy <= m2:
+                        pairs.append((min(i, j), max(i, j)))
+            pairs.sort()
+
+        return [(refs[i], refs[j]) for i, j in pairs]
+
+    def _build_footprint_index(self) -> Dict[str, "pcbnew.FOOTPRINT"]:
+        """遍历一次板上封装，建立 位号 -> 封装 索引"""
+        self._fp_index = {fp.GetReference(): fp for fp in self.board.GetFootprints()}
+        return self._fp_index
+
+    def _find_footprint(self, reference: str):
+        """按位号查找封装，优先使用索引，未命中时回退到KiCad查找"""
+        fp_index = self._fp_index
+        if fp_index is None:
+            fp_index = self._build_footprint_index()
+
+        footprint = fp_index.get(reference)
+        if footprint is None:
+            footprint = self.board.FindFootprintByReference(reference)
+            if footprint:
+                fp_index[reference] = footprint
+        return footprint
+
     def get_nets(self) -> List[KiCadNet]:
         """获取所有网络"""
         nets = []
@@ -115,16 +408,30 @@ class KiCadAPI:
         if not self.board or not KICAD_AVAILABLE:
             return nets
 
-        for net in self.board.GetNetInfo().NetsByNetcode().values():
-            pads = []
-            for pad in net.GetPads():
-                pads.append((pad.GetParent().GetReference(), str(pad.GetNumber())))
+        if not self._dirty and self._nets_cache is not None:
+            return list(self._nets_cache)
+
+        # 遍历一次封装建立 网络号 -> [(位号, 焊盘号)]，
+        # 外层循环已知道父封装，无需逐个焊盘调用 GetParent()
+        pad_owners = defaultdict(list)
+        for footprint in self.board.GetFootprints():
+            reference = footprint.GetReference()
+            for pad in footprint.Pads():
+                pad_owners[pad.GetNetCode()].append((reference, str(pad.GetNumber())))
 
+        for net in self.board.GetNetInfo().NetsByNetcode().values():
+            netcode = net.GetNetCode()
             nets.append(
-                KiCadNet(name=net.GetNetname(), netcode=net.GetNetCode(), pads=pads)
+                KiCadNet(
+                    name=net.GetNetname(),
+                    netcode=netcode,
+                    pads=pad_owners.get(netcode, []),
+                )
             )
 
-        return nets
+        self._nets_cache = nets
+        self._dirty = False
+        return list(nets)
 
     def place_component(
         self, reference: str, x: float, y: float, rotation: float = 0.0
@@ -141,19 +448,78 @@ class KiCadAPI:
             logger.warning(f"模拟模式：放置 {reference} 到 ({x}, {y})")
             return True
 
-        footprint = self.board.FindFootprintByReference(reference)
+        pcbnew = self._pn
+        footprint = self._find_footprint(reference)
         if not footprint:
             logger.error(f"找不到元件: {reference}")
             return False
 
         # 设置位置
-        pos = pcbnew.VECTOR2I(pcbnew.FromMM(x), pcbnew.FromMM(y))
+        pos = pcbnew.VECTOR2I(mm(x), mm(y))
         footprint.SetPosition(pos)
         footprint.SetOrientation(pcbnew.EDA_ANGLE(rotation, pcbnew.DEGREES_T))
+        self._dirty = True
+        self._pos_xy = None
 
         logger.info(f"放置 {reference} 到 ({x}, {y})，旋转 {rotation}°")
         return True
 
+    def place_components_batch(
+        self, spec, snapshot: Optional[List[KiCadComponent]] = None
+    ) -> int:
+        """
+        批量放置元件
+
+        Args:
+            spec: (位号, x, y[, 旋转角度]) 元组序列，坐标单位mm
+            snapshot: 传入列表时，追加成功放置的元件（含放置后的坐标），
+                供后续检查直接使用而无需再次遍历板子
+
+        Returns:
+            成功放置的元件数
+        """
+        if not self.board or not KICAD_AVAILABLE:
+            for reference, x, y, *_ in spec:
+                logger.warning(f"模拟模式：放置 {reference} 到 ({x}, {y})")
+            return len(spec)
+
+        pcbnew = self._pn
+        VECTOR2I = pcbnew.VECTOR2I
+        EDA_ANGLE = pcbnew.EDA_ANGLE
+        DEGREES_T = pcbnew.DEGREES_T
+        placed = 0
+
+        for reference, x, y, *rest in spec:
+            rotation = float(rest[0]) if rest else 0.0
+            footprint = self._find_footprint(reference)
+            if not footprint:
+                logger.error(f"找不到元件: {reference}")
+                continue
+
+            x_iu, y_iu = mm(x), mm(y)
+            footprint.SetPosition(VECTOR2I(x_iu, y_iu))
+            footprint.SetOrientation(EDA_ANGLE(rotation, DEGREES_T))
+            placed += 1
+            if snapshot is not None:
+                snapshot.append(
+                    KiCadComponent(
+                        reference=reference,
+                        footprint=footprint.GetFPID().GetLibItemName(),
+                        value=footprint.GetValue(),
+                        position=(x_iu / _IU_PER_MM, y_iu / _IU_PER_MM),
+                        rotation=rotation,
+                        layer=(
+                            "F.Cu" if footprint.GetLayer() == pcbnew.F_Cu else "B.Cu"
+                        ),
+                    )
+                )
+            logger.info(f"放置 {reference} 到 ({x}, {y})，旋转 {rotation}°")
+
+        if placed:
+            self._dirty = True
+            self._pos_xy = None
+        return placed
+
     def auto_place_components(self, strategy: str = "grid") -> Dict:
         """
         自动布局所有元件
@@ -189,38 +555,10 @@ class KiCadAPI:
         self, components: List[KiCadComponent]
     ) -> Dict[str, List[KiCadComponent]]:
         """按功能分组元件"""
-        groups = {
-            "power_input": [],
-            "protection": [],
-            "rectifier": [],
-            "filter": [],
-            "power_stage": [],
-            "transformer": [],
-            "output": [],
-            "feedback": [],
-            "other": [],
-        }
+        groups = defaultdict(list)
 
         for comp in components:
-            ref = comp.reference.upper()
-            if ref.startswith("J") and "IN" in ref:
-                groups["power_input"].append(comp)
-            elif ref.startswith("F") or ref.startswith("RV"):
-                groups["protection"].append(comp)
-            elif ref.startswith("BR") or "RECT" in ref:
-                groups["rectifier"].append(comp)
-            elif ref.startswith("T"):
-                groups["transformer"].append(comp)
-            elif ref.startswith("U") and "VIPER" in comp.value.upper():
-                groups["power_stage"].append(comp)
-            elif ref.startswith("C") and "400V" in comp.value:
-                groups["filter"].append(comp)
-            elif ref.startswith("D") or (ref.startswith("C") and "25V" in comp.value):
-                groups["output"].append(comp)
-            elif ref.startswith("R") or ref.startswith("U2") or ref.startswith("U3"):
-                groups["feedback"].append(comp)
-            else:
-                groups["other"].append(comp)
+            groups[_classify_component(comp.reference.upper(), comp.value)].append(comp)
 
         return groups
 
@@ -243,9 +581,6 @@ class KiCadAPI:
         grid_size = 5.0  # 5mm网格
 
         for group_name, components in groups.items():
-            if not components:
-                continue
-
             base_x, base_y = zones.get(group_name, (50, 50))
 
             for i, comp in enumerate(components):
@@ -262,8 +597,6 @@ class KiCadAPI:
 
     def _place_linear_layout(self, groups: Dict) -> int:
         """线性布局策略（信号流向）"""
-        placed = 0
-
         # 信号流向：左->右
         x_start = 20
         y_center = 60
@@ -279,20 +612,20 @@ class KiCadAPI:
             "output",
         ]
 
+        # 先算出全部坐标，再一次批量放置
+        spec = []
         x = x_start
         for group_name in order:
-            if group_name not in groups:
-                continue
-
-            components = groups[group_name]
-            for i, comp in enumerate(components):
-                y = y_center + (i - len(components) / 2) * 10
-                if self.place_component(comp.reference, x, y):
-                    placed += 1
-
+            # 空分组也占一列，保持各分组的横向位置不变
+            components = groups.get(group_name, ())
+            half = len(components) / 2
+            spec.extend(
+                (comp.reference, x, y_center + (i - half) * 10)
+                for i, comp in enumerate(components)
+            )
             x += x_step
 
-        return placed
+        return self.place_components_batch(spec)
 
     def _place_cluster_layout(self, groups: Dict) -> int:
         """聚类布局策略"""
@@ -331,20 +664,17 @@ class KiCadAPI:
         if not self.board or not KICAD_AVAILABLE:
             return {"status": "simulated", "routed": 0}
 
-        # 获取网络
-        nets = self.get_nets()
         routed = 0
 
-        # 优先布线关键网络
-        priority_nets = ["+12V", "GND", "VCC", "HV_PLUS"]
-
-        for net in nets:
-            if net.name in priority_nets:
+        # 优先布线关键网络：直接按名称查找，无需遍历全部网络
+        for name in _PRIORITY_NETS:
+            if self._find_net(name):
                 # 这些网络使用更粗的线
-                logger.info(f"优先布线: {net.name}")
+                logger.info(f"优先布线: {name}")
                 routed += 1
 
-        return {"status": "success", "routed": routed, "total_nets": len(nets)}
+        total_nets = self.board.GetNetInfo().GetNetCount()
+        return {"status": "success", "routed": routed, "total_nets": total_nets}
 
     def add_track(
         self,
@@ -368,28 +698,117 @@ class KiCadAPI:
             return True
 
         # 获取网络
-        net = self.board.FindNet(net_name)
+        net = self._find_net(net_name)
         if not net:
             logger.error(f"找不到网络: {net_name}")
             return False
 
-        # 创建走线
-        track = pcbnew.PCB_TRACK(self.board)
-        track.SetStart(
-            pcbnew.VECTOR2I(pcbnew.FromMM(start[0]), pcbnew.FromMM(start[1]))
-        )
-        track.SetEnd(pcbnew.VECTOR2I(pcbnew.FromMM(end[0]), pcbnew.FromMM(end[1])))
-        track.SetWidth(pcbnew.FromMM(width))
-        track.SetNet(net)
-
-        layer_id = pcbnew.F_Cu if layer == "F.Cu" else pcbnew.B_Cu
-        track.SetLayer(layer_id)
-
-        self.board.Add(track)
+        self._add_item(self._make_track(start, end, net, width, layer))
+        self._dirty = True
         logger.info(f"添加走线: {net_name} ({start} -> {end}), 宽度 {width}mm")
 
         return True
 
+    def _add_item(self, item):
+        """向板子添加对象，批量布线期间跳过连通性更新"""
+        bulk_mode = getattr(self._pn, "ADD_MODE_BULK_APPEND", None)
+        add_native = getattr(self.board, "AddNative", None)
+        if self._bulk_depth and bulk_mode is not None and add_native is not None:
+            # Python层的 BOARD.Add 只接受 item，带模式参数需直接调用 AddNative；
+            # 所有权交给板子，与 BOARD.Add 的做法一致
+            item.thisown = 0
+            add_native(item, bulk_mode, True)
+            self._connectivity_stale = True
+        else:
+            self.board.Add(item)
+
+    def begin_bulk_route(self):
+        """开始批量布线：之后添加的走线暂不更新连通性"""
+        self._bulk_depth += 1
+
+    def end_bulk_route(self):
+        """结束批量布线：统一重建一次连通性"""
+        self._bulk_depth -= 1
+        if self._bulk_depth == 0 and self._connectivity_stale:
+            self.board.BuildConnectivity()
+            self._connectivity_stale = False
+
+    @contextmanager
+    def bulk_route(self):
+        """
+        批量布线上下文
+
+        用法::
+
+            with api.bulk_route():
+                api.add_track(...)
+                api.add_track(...)
+        """
+        self.begin_bulk_route()
+        try:
+            yield self
+        finally:
+            self.end_bulk_route()
+
+    def add_tracks_bulk(self, specs: List[Tuple]) -> int:
+        """
+        批量添加走线
+
+        逐条添加时每次 board.Add 都会触发连通性更新；
+        这里在 bulk_route 中添加，全部添加后只重建一次连通性。
+
+        Args:
+            specs: (start, end, net_name, width[, layer]) 元组列表
+
+        Returns:
+            成功添加的走线数
+        """
+        added = 0
+        with self.bulk_route():
+            for start, end, net_name, width, *rest in specs:
+                layer = rest[0] if rest else "F.Cu"
+                if self.add_track(start, end, net_name, width, layer):
+                    added += 1
+
+        return added
+
+    def _find_net(self, net_name: str):
+        """按名称查找网络，首次调用时缓存全部网络"""
+        if self._net_cache is None:
+            self._net_cache = {
+                str(name): net
+                for name, net in self.board.GetNetInfo().NetsByName().items()
+            }
+
+        net = self._net_cache.get(net_name)
+        if net is None:
+            net = self.board.FindNet(net_name)
+            if net:
+                self._net_cache[net_name] = net
+        return net
+
+    def _make_track(
+        self,
+        start: Tuple[float, float],
+        end: Tuple[float, float],
+        net,
+        width: float,
+        layer: str,
+    ):
+        """创建走线对象"""
+        pcbnew = self._pn
+        track = pcbnew.PCB_TRACK(self.board)
+        v = self._scratch_v
+        v.x, v.y = mm(start[0]), mm(start[1])
+        track.SetStart(v)
+        v.x, v.y = mm(end[0]), mm(end[1])
+        track.SetEnd(v)
+        track.SetWidth(mm(width))
+        track.SetNet(net)
+
+        track.SetLayer(_LAYER_MAP.get(layer, pcbnew.B_Cu))
+        return track
+
     def design_rules_check(self) -> Dict:
         """设计规则检查"""
         if not self.board or not KICAD_AVAILABLE:
@@ -410,14 +829,32 @@ class KiCadAPI:
             return False
 
         self.board.Save(save_path)
+        self._reset_caches()
         logger.info(f"保存PCB: {save_path}")
         return True
 
+    def load_board(self, board_path: str) -> bool:
+        """从文件重新加载PCB，替换当前板子"""
+        if self._pn is None or not os.path.exists(board_path):
+            return False
+
+        self.board = self._pn.LoadBoard(board_path)
+        self._reset_caches()
+        logger.info(f"加载PCB: {board_path}")
+        return True
+
+    def _reset_caches(self):
+        """清空与板子内容相关的缓存"""
+        self._fp_index = None
+        self._net_cache = None
+        self._dirty = True
+        self._pos_xy = None
+
     def export_to_skill(self) -> Dict:
         """导出当前设计为skill可用的JSON格式"""
         data = {
-            "components": [asdict(c) for c in self.get_components()],
-            "nets": [asdict(n) for n in self.get_nets()],
+            "components": [c.to_dict() for c in self.get_components()],
+            "nets": [n.to_dict() for n in self.get_nets()],
             "board_path": self.board_path,
         }
         return data
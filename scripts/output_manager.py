@@ -11,6 +11,9 @@ from datetime import datetime
 from typing import Optional
 import re
 
+# 版本目录名，如 v1.0.3
+_VERSION_RE = re.compile(r"v(\d+)\.(\d+)\.(\d+)")
+
 
 class OutputManager:
     """
@@ -40,22 +43,20 @@ class OutputManager:
         if not os.path.exists(base_path):
             return "v1.0.0"
 
-        # 查找现有版本
+        # 查找现有版本（scandir 直接给出目录项类型，无需逐项 stat）
         versions = []
-        for item in os.listdir(base_path):
-            if os.path.isdir(os.path.join(base_path, item)):
-                # 尝试解析版本号
-                match = re.match(r"v(\d+)\.(\d+)\.(\d+)", item)
+        with os.scandir(base_path) as it:
+            for entry in it:
+                if not entry.is_dir():
+                    continue
+                match = _VERSION_RE.match(entry.name)
                 if match:
-                    versions.append(
-                        (int(match.group(1)), int(match.group(2)), int(match.group(3)))
-                    )
-
-        if not versions:
-            return "v1.0.0"
+                    versions.append(tuple(map(int, match.groups())))
 
         # 获取最新版本并递增
-        latest = max(versions)
+        latest = max(versions, default=None)
+        if latest is None:
+            return "v1.0.0"
         return f"v{latest[0]}.{latest[1]}.{latest[2] + 1}"
 
     def _create_output_dir(self) -> str:
@@ -10,17 +10,27 @@
 import sys
 import os
 import math
+import json
+import shutil
+import hashlib
+from functools import lru_cache
 from typing import List, Dict, Tuple, Optional
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict
 
 # 导入KiCad集成层
 try:
+    from . import __version__
     from .kicad_integration import KiCadAPI, KiCadComponent, KiCadPlugin
 except ImportError:
     from kicad_integration import KiCadAPI, KiCadComponent, KiCadPlugin
 
+    __version__ = "standalone"
 
-@dataclass
+# Python 3.10+ 的数据类使用__slots__
+_DATACLASS_OPTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(**_DATACLASS_OPTS)
 class PowerSupplyConfig:
     """电源配置"""
 
@@ -31,6 +41,111 @@ class PowerSupplyConfig:
     controller: str = "VIPer22A"  # 主控IC
 
 
+# 专业布局表：(位号, x, y, 旋转角度)，坐标单位mm
+_PRO_LAYOUT = (
+    # === 区域1: AC输入（最左侧）===
+    ("J1", 15, 80, 0),  # AC输入端子
+    # === 区域2: 保护（左侧）===
+    ("F1", 35, 80, 0),  # 保险丝，靠近输入
+    ("RV1", 35, 65, 0),  # 压敏电阻，在保险丝下方
+    # === 区域3: 整流（左中）===
+    ("BR1", 55, 80, 0),  # 整流桥
+    ("C1", 75, 80, 0),  # 高压滤波电容（并联两个）
+    ("C1B", 75, 65, 0),
+    # === 区域4: 功率级（中心）===
+    ("U1", 55, 50, 0),  # VIPer22A - 主控IC，中心位置
+    ("C2", 40, 50, 0),  # VCC去耦电容，靠近VIPer
+    ("T1", 90, 55, 0),  # 变压器，功率级核心
+    # === 区域5: 输出（右侧，低压区）===
+    ("D1", 110, 70, 90),  # 输出整流二极管
+    ("C3", 110, 45, 0),  # 输出主滤波电容
+    ("C4", 110, 30, 0),  # 输出辅助滤波电容
+    ("J2", 110, 15, 0),  # 输出端子
+    # === 区域6: 反馈电路（下方）===
+    ("U2", 75, 30, 0),  # 光耦
+    ("U3", 90, 30, 0),  # TL431
+    ("R1", 75, 20, 0),  # 反馈分压电阻
+    ("R2", 90, 20, 0),
+)
+
+# 专业布线表：(起点, 终点, 网络, 线宽mm)
+_PRO_ROUTES = (
+    # === 高压输入布线 ===
+    # AC输入 -> 保险丝（粗线）
+    ((15, 80), (30, 80), "AC_L", 0.8),
+    # 保险丝 -> 整流桥
+    ((40, 80), (50, 80), "AC_L_FUSED", 0.8),
+    # === 整流输出 ===
+    # 整流桥 -> 滤波电容（高压，粗线）
+    ((60, 80), (70, 80), "HV_PLUS", 1.2),
+    # 电容并联
+    ((75, 75), (75, 70), "HV_PLUS", 1.0),
+    # === 功率级布线 ===
+    # 滤波电容 -> VIPer（短路径）
+    ((75, 80), (60, 55), "HV_PLUS", 1.0),
+    # VIPer -> 变压器初级
+    ((65, 50), (85, 55), "DRAIN", 1.0),
+    # 变压器辅助绕组 -> VIPer VDD
+    ((85, 55), (55, 52), "VDD", 0.5),
+    # VCC电容
+    ((55, 52), (40, 52), "VDD", 0.5),
+    # === 输出级布线 ===
+    # 变压器次级 -> 整流二极管
+    ((95, 55), (110, 65), "SEC_PLUS", 1.5),
+    # 整流二极管 -> 输出电容（星型连接）
+    ((110, 75), (110, 50), "OUT_PLUS", 1.5),
+    # 输出电容并联
+    ((110, 40), (110, 30), "OUT_PLUS", 1.5),
+    # 输出到端子
+    ((110, 20), (110, 15), "OUT_PLUS", 1.5),
+    # === 地线连接（星型） ===
+    # 整流桥地
+    ((60, 75), (60, 70), "GND", 1.0),
+    # 输出地
+    ((105, 45), (105, 30), "GND", 1.0),
+    ((105, 30), (105, 15), "GND", 1.0),
+    # 反馈地
+    ((75, 25), (75, 20), "GND", 0.3),
+)
+
+# 布局/布线表的摘要，作为设计缓存键的一部分
+_LAYOUT_CONSTANTS_HASH = hashlib.sha1(
+    repr((_PRO_LAYOUT, _PRO_ROUTES)).encode()
+).digest()
+
+# 设计结果缓存目录名（位于输出根目录 output-result 下）
+_DESIGN_CACHE_DIRNAME = ".cache"
+_OUTPUT_ROOT_NAME = "output-result"
+
+
+@lru_cache(maxsize=None)
+def _code_digest() -> bytes:
+    """设计器及KiCad集成层源码的摘要，任一源码改动都会使旧缓存失效"""
+    h = hashlib.sha1()
+    for path in (__file__, sys.modules[KiCadAPI.__module__].__file__):
+        with open(path, "rb") as f:
+            h.update(f.read())
+    return h.digest()
+
+
+def _design_cache_dir(board_path: str) -> str:
+    """
+    设计缓存目录
+
+    输出PCB位于 output-result 目录树中时放在该输出根目录下（各版本子目录共享），
+    否则放在输出PCB所在目录下；与当前工作目录无关。
+    """
+    out_dir = os.path.dirname(os.path.abspath(board_path))
+    d = out_dir
+    while True:
+        if os.path.basename(d) == _OUTPUT_ROOT_NAME:
+            return os.path.join(d, _DESIGN_CACHE_DIRNAME)
+        parent = os.path.dirname(d)
+        if parent == d:
+            return os.path.join(out_dir, _DESIGN_CACHE_DIRNAME)
+        d = parent
+
+
 class PowerSupplyDesigner:
     """
     电源设计器
@@ -41,6 +156,8 @@ class PowerSupplyDesigner:
     def __init__(self, kicad_api: Optional[KiCadAPI] = None):
         self.api = kicad_api or KiCadAPI()
         self.config = PowerSupplyConfig()
+        # 最近一次专业布局放置的元件快照，供 optimize_layout 复用
+        self.last_placement: Optional[List[KiCadComponent]] = None
 
     def create_220v_to_12v_design(self, board_path: Optional[str] = None) -> Dict:
         """
@@ -60,26 +177,37 @@ class PowerSupplyDesigner:
             "strategy_used": "professional",
         }
 
-        # 步骤1: 创建板框
-        print("\n[1/4] 创建板框...")
-        self._create_board_outline()
-
-        # 步骤2: 放置元件（使用专业布局）
-        print("\n[2/4] 放置元件（专业分区布局）...")
-        result["components_placed"] = self._place_components_pro()
-
-        # 步骤3: 创建网络
-        print("\n[3/4] 创建网络和连接...")
-        result["nets_created"] = self._create_nets()
-
-        # 步骤4: 布线（使用KiCad API）
-        print("\n[4/4] 自动布线...")
-        result["tracks_routed"] = self._route_tracks()
+        cache_key = self._design_cache_key() if board_path else None
+        cached = self._load_cached_design(cache_key, board_path) if cache_key else None
 
-        # 保存
-        if board_path:
-            self.api.save_board(board_path)
+        if cached is not None:
+            result.update(cached)
+            self.last_placement = None
+            print(f"\n使用缓存的设计结果: {cache_key[:12]}")
             print(f"\n保存到: {board_path}")
+        else:
+            # 步骤1: 创建板框
+            print("\n[1/4] 创建板框...")
+            self._create_board_outline()
+
+            # 步骤2: 放置元件（使用专业布局）
+            print("\n[2/4] 放置元件（专业分区布局）...")
+            placed, self.last_placement = self._place_components_pro()
+            result["components_placed"] = placed
+
+            # 步骤3: 创建网络
+            print("\n[3/4] 创建网络和连接...")
+            result["nets_created"] = self._create_nets()
+
+            # 步骤4: 布线（使用KiCad API）
+            print("\n[4/4] 自动布线...")
+            result["tracks_routed"] = self._route_tracks()
+
+            # 保存
+            if board_path:
+                if self.api.save_board(board_path) and cache_key:
+                    self._store_cached_design(cache_key, board_path, result)
+                print(f"\n保存到: {board_path}")
 
         print("\n" + "=" * 60)
         print("设计完成!")
@@ -90,13 +218,70 @@ class PowerSupplyDesigner:
 
         return result
 
+    def _design_cache_key(self) -> Optional[str]:
+        """
+        计算设计缓存键
+
+        设计结果由配置、布局/布线表、代码版本及源码和输入PCB共同决定；
+        输入PCB不是文件时（如KiCad中当前打开的板子）不使用缓存。
+        """
+        source = self.api.board_path
+        if not self.api.board or not source or not os.path.isfile(source):
+            return None
+
+        h = hashlib.sha1(repr(asdict(self.config)).encode())
+        h.update(_LAYOUT_CONSTANTS_HASH)
+        h.update(__version__.encode())
+        h.update(_code_digest())
+        with open(source, "rb") as f:
+            h.update(f.read())
+        return h.hexdigest()
+
+    def _load_cached_design(self, key: str, board_path: str) -> Optional[Dict]:
+        """命中缓存时把缓存的PCB复制到目标路径并重新加载，返回缓存的结果统计"""
+        cache_dir = _design_cache_dir(board_path)
+        cached_pcb = os.path.join(cache_dir, f"{key}.kicad_pcb")
+        cached_meta = os.path.join(cache_dir, f"{key}.json")
+
+        # 缓存条目缺失或损坏时直接放弃缓存，重新生成设计
+        try:
+            with open(cached_meta, "r", encoding="utf-8") as f:
+                result = json.load(f)
+            shutil.copyfile(cached_pcb, board_path)
+        except (OSError, ValueError):
+            return None
+
+        if not self.api.load_board(board_path):
+            return None
+        return result
+
+    def _store_cached_design(self, key: str, board_path: str, result: Dict):
+        """
+        把已保存的设计写入缓存
+
+        先写PCB再写结果统计，两者都先写临时文件再原子替换；
+        结果统计文件存在即表示对应PCB已完整写入。
+        """
+        cache_dir = _design_cache_dir(board_path)
+        cached_pcb = os.path.join(cache_dir, f"{key}.kicad_pcb")
+        cached_meta = os.path.join(cache_dir, f"{key}.json")
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            shutil.copyfile(board_path, cached_pcb + ".tmp")
+            os.replace(cached_pcb + ".tmp", cached_pcb)
+            with open(cached_meta + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(result, f, ensure_ascii=False)
+            os.replace(cached_meta + ".tmp", cached_meta)
+        except OSError:
+            pass
+
     def _create_board_outline(self):
         """创建板框"""
         # 在KiCad中板子尺寸通常是100mm x 80mm
         # 这里通过设置元件边界来实现
         pass
 
-    def _place_components_pro(self) -> int:
+    def _place_components_pro(self) -> Tuple[int, List[KiCadComponent]]:
         """
         专业级元件布局
 
@@ -105,80 +290,13 @@ class PowerSupplyDesigner:
         2. 功率级（中部）: VIPer、变压器
         3. 低压区（右侧）: 输出整流滤波
         4. 反馈（下方）: 光耦、TL431
+
+        Returns:
+            (放置数量, 已放置元件的快照)
         """
-        placed = 0
-
-        # === 区域1: AC输入（最左侧）===
-        # J1 - AC输入端子
-        if self.api.place_component("J1", 15, 80):
-            placed += 1
-
-        # === 区域2: 保护（左侧）===
-        # F1 - 保险丝，靠近输入
-        if self.api.place_component("F1", 35, 80):
-            placed += 1
-
-        # RV1 - 压敏电阻，在保险丝下方
-        if self.api.place_component("RV1", 35, 65):
-            placed += 1
-
-        # === 区域3: 整流（左中）===
-        # BR1 - 整流桥
-        if self.api.place_component("BR1", 55, 80):
-            placed += 1
-
-        # C1 - 高压滤波电容（并联两个）
-        if self.api.place_component("C1", 75, 80):
-            placed += 1
-        if self.api.place_component("C1B", 75, 65):
-            placed += 1
-
-        # === 区域4: 功率级（中心）===
-        # VIPer22A - 主控IC，中心位置
-        if self.api.place_component("U1", 55, 50, rotation=0):
-            placed += 1
-
-        # C2 - VCC去耦电容，靠近VIPer
-        if self.api.place_component("C2", 40, 50):
-            placed += 1
-
-        # T1 - 变压器，功率级核心
-        if self.api.place_component("T1", 90, 55):
-            placed += 1
-
-        # === 区域5: 输出（右侧，低压区）===
-        # D1 - 输出整流二极管
-        if self.api.place_component("D1", 110, 70, rotation=90):
-            placed += 1
-
-        # C3 - 输出主滤波电容
-        if self.api.place_component("C3", 110, 45):
-            placed += 1
-
-        # C4 - 输出辅助滤波电容
-        if self.api.place_component("C4", 110, 30):
-            placed += 1
-
-        # J2 - 输出端子
-        if self.api.place_component("J2", 110, 15):
-            placed += 1
-
-        # === 区域6: 反馈电路（下方）===
-        # U2 - 光耦
-        if self.api.place_component("U2", 75, 30):
-            placed += 1
-
-        # U3 - TL431
-        if self.api.place_component("U3", 90, 30):
-            placed += 1
-
-        # R1, R2 - 反馈分压电阻
-        if self.api.place_component("R1", 75, 20):
-            placed += 1
-        if self.api.place_component("R2", 90, 20):
-            placed += 1
-
-        return placed
+        snapshot: List[KiCadComponent] = []
+        placed = self.api.place_components_batch(_PRO_LAYOUT, snapshot)
+        return placed, snapshot
 
     def _create_nets(self) -> int:
         """创建电源网络"""
@@ -214,79 +332,11 @@ class PowerSupplyDesigner:
         3. 反馈信号细线，远离功率级
         4. 星型接地
         """
-        routed = 0
-
-        # === 高压输入布线 ===
-        # AC输入 -> 保险丝（粗线）
-        if self.api.add_track((15, 80), (30, 80), "AC_L", width=0.8):
-            routed += 1
-
-        # 保险丝 -> 整流桥
-        if self.api.add_track((40, 80), (50, 80), "AC_L_FUSED", width=0.8):
-            routed += 1
-
-        # === 整流输出 ===
-        # 整流桥 -> 滤波电容（高压，粗线）
-        if self.api.add_track((60, 80), (70, 80), "HV_PLUS", width=1.2):
-            routed += 1
-
-        # 电容并联
-        if self.api.add_track((75, 75), (75, 70), "HV_PLUS", width=1.0):
-            routed += 1
-
-        # === 功率级布线 ===
-        # 滤波电容 -> VIPer（短路径）
-        if self.api.add_track((75, 80), (60, 55), "HV_PLUS", width=1.0):
-            routed += 1
-
-        # VIPer -> 变压器初级
-        if self.api.add_track((65, 50), (85, 55), "DRAIN", width=1.0):
-            routed += 1
-
-        # 变压器辅助绕组 -> VIPer VDD
-        if self.api.add_track((85, 55), (55, 52), "VDD", width=0.5):
-            routed += 1
-
-        # VCC电容
-        if self.api.add_track((55, 52), (40, 52), "VDD", width=0.5):
-            routed += 1
-
-        # === 输出级布线 ===
-        # 变压器次级 -> 整流二极管
-        if self.api.add_track((95, 55), (110, 65), "SEC_PLUS", width=1.5):
-            routed += 1
+        return self.api.add_tracks_bulk(_PRO_ROUTES)
 
-        # 整流二极管 -> 输出电容（星型连接）
-        if self.api.add_track((110, 75), (110, 50), "OUT_PLUS", width=1.5):
-            routed += 1
-
-        # 输出电容并联
-        if self.api.add_track((110, 40), (110, 30), "OUT_PLUS", width=1.5):
-            routed += 1
-
-        # 输出到端子
-        if self.api.add_track((110, 20), (110, 15), "OUT_PLUS", width=1.5):
-            routed += 1
-
-        # === 地线连接（星型） ===
-        # 整流桥地
-        if self.api.add_track((60, 75), (60, 70), "GND", width=1.0):
-            routed += 1
-
-        # 输出地
-        if self.api.add_track((105, 45), (105, 30), "GND", width=1.0):
-            routed += 1
-
-        if self.api.add_track((105, 30), (105, 15), "GND", width=1.0):
-            routed += 1
-
-        # 反馈地
-        if self.api.add_track((75, 25), (75, 20), "GND", width=0.3):
-            routed += 1
-
-        return routed
-
-    def optimize_layout(self) -> Dict:
+    def optimize_layout(
+        self, components: Optional[List[KiCadComponent]] = None
+    ) -> Dict:
         """
         布局优化
 
@@ -294,14 +344,19 @@ class PowerSupplyDesigner:
         1. 电流回路面积
         2. 关键器件间距
         3. 走线长度
+
+        Args:
+            components: 元件快照（如 last_placement），None则读取当前板子
         """
         optimizations = []
 
         # 获取当前布局
-        components = self.api.get_components()
+        if components is None:
+            components = self.api.get_components()
+        by_ref = {c.reference: c for c in components}
 
         # 检查变压器位置（应该在中心）
-        transformer = next((c for c in components if c.reference == "T1"), None)
+        transformer = by_ref.get("T1")
         if transformer:
             # 变压器应该在板子中心区域
             tx, ty = transformer.position
@@ -311,20 +366,18 @@ class PowerSupplyDesigner:
                 optimizations.append(f"变压器位置可能需要调整: ({tx}, {ty})")
 
         # 检查VIPer位置
-        viper = next((c for c in components if c.reference == "U1"), None)
+        viper = by_ref.get("U1")
         if viper:
             vx, vy = viper.position
             # VIPer应该靠近变压器和输入电容
             optimizations.append(f"VIPer位置: ({vx}, {vy})")
 
         # 检查高压电容是否靠近整流桥
-        cap = next((c for c in components if c.reference == "C1"), None)
-        bridge = next((c for c in components if c.reference == "BR1"), None)
+        cap = by_ref.get("C1")
+        bridge = by_ref.get("BR1")
         if cap and bridge:
-            distance = math.sqrt(
-                (cap.position[0] - bridge.position[0]) ** 2
-                + (cap.position[1] - bridge.position[1]) ** 2
-            )
+            bx, by = bridge.position
+            distance = math.hypot(cap.position[0] - bx, cap.position[1] - by)
             if distance < 25:  # 25mm以内
                 optimizations.append(f"输入电容靠近整流桥: {distance:.1f}mm ✓")
             else:
@@ -385,7 +438,7 @@ def main():
 
     # 优化检查
     print("\n执行优化检查...")
-    opt = designer.optimize_layout()
+    opt = designer.optimize_layout(designer.last_placement)
     for detail in opt.get("details", []):
         print(f"  - {detail}")
 
@@ -16,16 +16,20 @@ KiCad Vision 模块 - 自动截图和分析系统
     report = analyzer.analyze()
 """
 
-from .auto_analyzer import (
-    KiCadAutoAnalyzer,
-    ScreenshotCapture,
-    KiCadWindowDetector,
-    SimpleImageAnalyzer,
-    DesignAdvisor,
-    AnalysisReport,
-    DesignIssue,
-    KiCadUIState,
-)
+import importlib
+
+# 导出名 -> 所在子模块；首次访问时才导入（PEP 562），
+# 避免仅导入 scripts 包时就加载截图/图像相关依赖
+_LAZY = {
+    "KiCadAutoAnalyzer": "auto_analyzer",
+    "ScreenshotCapture": "auto_analyzer",
+    "KiCadWindowDetector": "auto_analyzer",
+    "SimpleImageAnalyzer": "auto_analyzer",
+    "DesignAdvisor": "auto_analyzer",
+    "AnalysisReport": "auto_analyzer",
+    "DesignIssue": "auto_analyzer",
+    "KiCadUIState": "auto_analyzer",
+}
 
 __all__ = [
     "KiCadAutoAnalyzer",
@@ -37,3 +41,16 @@ __all__ = [
     "DesignIssue",
     "KiCadUIState",
 ]
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        module = importlib.import_module(f".{_LAZY[name]}", __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY))
@@ -12,18 +12,36 @@ KiCad 自动截图分析系统 V1.0
     python -m scripts.vision.auto_analyzer
 """
 
+import atexit
+import functools
+import importlib
 import os
+import re
 import sys
 import time
 import json
 import logging
+import mmap
+import queue
 import subprocess
+import threading
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Any
+from types import MappingProxyType
+from typing import Dict, Iterator, List, Mapping, Optional, Tuple, Any
 from dataclasses import dataclass, field, asdict
 from enum import Enum
 
+try:
+    import numpy as np
+
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
 # 配置日志
 logging.basicConfig(
     level=logging.INFO,
@@ -34,6 +52,14 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# PCB文件中不区分大小写的标记，仅在常见小写写法找不到时才用正则兜底
+_PCB_EDGE_RE = re.compile(rb"\(edge", re.IGNORECASE)
+_PCB_ZONE_RE = re.compile(rb"\(zone", re.IGNORECASE)
+# 大文件分块统计走线数时每块的大小
+_PCB_SCAN_CHUNK = 8 << 20
+# 超过该大小的PCB文件改用mmap扫描，避免一次性读入内存
+_PCB_MMAP_THRESHOLD = 1 << 20
+
 
 class ScreenshotBackend(Enum):
     """截图后端类型"""
@@ -42,6 +68,7 @@ class ScreenshotBackend(Enum):
     PIL = "pil"  # 使用PIL ImageGrab
     MSS = "mss"  # 使用mss高性能截图
     PYAUTOGUI = "pyautogui"  # 使用pyautogui
+    DXCAM = "dxcam"  # 使用DXcam（Windows Desktop Duplication）
 
 
 class KiCadViewType(Enum):
@@ -58,6 +85,18 @@ class KiCadViewType(Enum):
     ERROR = "错误界面"
 
 
+# 窗口标题关键字，分组顺序即判定优先级（"pcb" 同时覆盖 "pcbnew"）
+_VIEW_RE = re.compile(
+    r"(pcb)|(eeschema|schematic)|(project)|(error|错误)", re.IGNORECASE
+)
+_VIEW_BY_GROUP = {
+    1: KiCadViewType.PCB_EDITOR,
+    2: KiCadViewType.SCHEMATIC,
+    3: KiCadViewType.PROJECT_MANAGER,
+    4: KiCadViewType.ERROR,
+}
+
+
 @dataclass
 class ScreenshotResult:
     """截图结果"""
@@ -67,6 +106,13 @@ class ScreenshotResult:
     timestamp: str
     error_message: str = ""
     backend_used: str = ""
+    # 内存中的截图像素 (H, W, C)，可直接交给分析器，免去PNG解码
+    image: Optional[Any] = None
+    # 后台PNG写盘任务，需要文件落盘时调用 .result()
+    save_future: Optional[Future] = None
+    # 低分辨率缩略图（JPEG），供OCR/模板匹配等后续分析先在小图上进行
+    thumbnail_path: Optional[str] = None
+    thumbnail_future: Optional[Future] = None
 
 
 @dataclass
@@ -111,24 +157,84 @@ class AnalysisReport:
     next_steps: List[str]
 
 
+@functools.lru_cache(maxsize=None)
+def _optional_module(name: str):
+    """导入可选依赖并缓存结果，不可用时返回 None（每个模块只探测一次）"""
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
+
+
+def _have(name: str) -> bool:
+    """可选依赖是否可用"""
+    return _optional_module(name) is not None
+
+
+# 尚未关闭的截图器，进程退出时统一释放（弱引用，不影响正常回收）
+_OPEN_CAPTURES: "weakref.WeakSet[ScreenshotCapture]" = weakref.WeakSet()
+
+
+@atexit.register
+def _close_open_captures():
+    for capture in list(_OPEN_CAPTURES):
+        try:
+            # 退出阶段不阻塞等待写盘任务
+            capture.close(wait=False)
+        except Exception:
+            pass
+
+
+def _json_default(obj):
+    """JSON序列化兜底：枚举输出其值"""
+    if isinstance(obj, Enum):
+        return obj.value
+    raise TypeError(f"无法序列化类型: {type(obj).__name__}")
+
+
 class ScreenshotCapture:
     """
     截图捕获器 - 支持多种截图方式，自动选择最佳方案
     """
 
+    # 缩略图目标宽度（像素），按整数步长降采样
+    THUMBNAIL_WIDTH = 512
+
     def __init__(self, output_dir: str = "./screenshots"):
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
         self.backend: Optional[ScreenshotBackend] = None
+        # mss实例常驻复用，避免每帧重新初始化系统截图句柄和像素缓冲区；
+        # mss句柄绑定创建它的线程（X11/GDI上下文），因此每个截图线程各持一个
+        self._sct_local = threading.local()
+        self._scts: List[Any] = []  # 全部已创建的mss句柄，close() 时统一释放
+        self._monitor = None
+        self._cam = None
+        self._sct_lock = threading.Lock()
+        # PNG编码/写盘放到后台线程，capture() 只负责抓取像素
+        self._io_pool = ThreadPoolExecutor(
+            max_workers=2, thread_name_prefix="screenshot-io"
+        )
+        # 每个写盘线程各自复用一块RGB转换缓冲区
+        self._rgb_bufs = threading.local()
         self._detect_best_backend()
+        _OPEN_CAPTURES.add(self)
+
+    def __enter__(self) -> "ScreenshotCapture":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
 
     def _detect_best_backend(self):
-        """检测最佳可用的截图后端"""
+        """检测最佳可用的截图后端（Windows优先DXcam，其余平台优先mss）"""
         backends_to_try = [
-            (ScreenshotBackend.PIL, self._check_pil),
             (ScreenshotBackend.MSS, self._check_mss),
+            (ScreenshotBackend.PIL, self._check_pil),
             (ScreenshotBackend.PYAUTOGUI, self._check_pyautogui),
         ]
+        if sys.platform == "win32":
+            backends_to_try.insert(0, (ScreenshotBackend.DXCAM, self._check_dxcam))
 
         for backend, check_func in backends_to_try:
             if check_func():
@@ -139,32 +245,73 @@ class ScreenshotCapture:
         logger.warning("⚠ 未找到可用的截图库，将使用模拟模式")
         self.backend = None
 
-    def _check_pil(self) -> bool:
-        """检查PIL是否可用"""
+    def _check_dxcam(self) -> bool:
+        """检查DXcam是否可用（仅Windows）"""
+        dxcam = _optional_module("dxcam")
+        if dxcam is None:
+            return False
         try:
-            from PIL import ImageGrab
-
+            camera = dxcam.create(output_idx=0)
+            if camera is None:
+                return False
+            camera.start()
+            self._cam = camera
             return True
-        except ImportError:
+        except Exception:
             return False
 
+    def _check_pil(self) -> bool:
+        """检查PIL是否可用"""
+        return _have("PIL.ImageGrab")
+
     def _check_mss(self) -> bool:
         """检查mss是否可用"""
+        mss = _optional_module("mss")
+        if mss is None or not _have("mss.tools"):
+            return False
+        # 无显示环境（如无 $DISPLAY 的Linux）下 mss 抛出 ScreenShotError，
+        # 此时视为不可用，继续尝试下一个后端
         try:
-            import mss
-
-            return True
-        except ImportError:
+            sct = mss.mss()
+        except Exception:
             return False
+        try:
+            monitor = sct.monitors[0]
+        except Exception:
+            sct.close()
+            return False
+        self._register_sct(sct)
+        self._monitor = monitor
+        return True
+
+    def _register_sct(self, sct):
+        """把mss句柄登记为当前线程的句柄"""
+        self._sct_local.sct = sct
+        with self._sct_lock:
+            self._scts.append(sct)
+
+    def _thread_sct(self):
+        """返回当前线程的mss句柄，首次在该线程截图时创建"""
+        sct = getattr(self._sct_local, "sct", None)
+        if sct is None:
+            sct = _optional_module("mss").mss()
+            self._register_sct(sct)
+        return sct
+
+    def _release_thread_sct(self):
+        """在截图线程退出前调用：于本线程内关闭其mss句柄"""
+        sct = getattr(self._sct_local, "sct", None)
+        if sct is None:
+            return
+        self._sct_local.sct = None
+        with self._sct_lock:
+            if sct in self._scts:
+                self._scts.remove(sct)
+        sct.close()
 
     def _check_pyautogui(self) -> bool:
         """检查pyautogui是否可用"""
-        try:
-            import pyautogui
-
-            return True
-        except ImportError:
-            return False
+        return _have("pyautogui")
 
     def capture(self, filename: Optional[str] = None) -> ScreenshotResult:
         """
@@ -176,74 +323,203 @@ class ScreenshotCapture:
         Returns:
             ScreenshotResult: 截图结果
         """
+        # 只取一次当前时间，文件名与结果中的时间戳保持一致
+        now = datetime.now()
+        timestamp = now.isoformat()
         if filename is None:
-            filename = f"kicad_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
+            filename = f"kicad_{now.strftime('%Y%m%d_%H%M%S')}.png"
 
-        file_path = self.output_dir / filename
+        file_path = str(self.output_dir / filename)
 
         try:
-            if self.backend == ScreenshotBackend.PIL:
-                return self._capture_with_pil(str(file_path))
+            if self.backend == ScreenshotBackend.DXCAM:
+                return self._capture_with_dxcam(file_path, timestamp)
+            elif self.backend == ScreenshotBackend.PIL:
+                return self._capture_with_pil(file_path, timestamp)
             elif self.backend == ScreenshotBackend.MSS:
-                return self._capture_with_mss(str(file_path))
+                return self._capture_with_mss(file_path, timestamp)
             elif self.backend == ScreenshotBackend.PYAUTOGUI:
-                return self._capture_with_pyautogui(str(file_path))
+                return self._capture_with_pyautogui(file_path, timestamp)
             else:
-                return self._capture_mock(str(file_path))
+                return self._capture_mock(file_path, timestamp)
         except Exception as e:
             logger.error(f"截图失败: {e}")
             return ScreenshotResult(
                 success=False,
                 file_path=None,
-                timestamp=datetime.now().isoformat(),
+                timestamp=timestamp,
                 error_message=str(e),
                 backend_used="failed",
             )
 
-    def _capture_with_pil(self, file_path: str) -> ScreenshotResult:
-        """使用PIL截图"""
-        from PIL import ImageGrab
+    def _capture_with_dxcam(self, file_path: str, timestamp: str) -> ScreenshotResult:
+        """使用DXcam截图"""
+        # get_latest_frame 会阻塞到下一帧到达，无需额外预热；
+        # 返回值可能是DXcam环形缓冲区的视图，复制一份再交给后台写盘，
+        # 避免后续帧在写完前覆盖它
+        frame = self._cam.get_latest_frame().copy()
+
+        save_future = self._io_pool.submit(self._write_rgb_png, frame, file_path)
+        thumbnail_path, thumbnail_future = self._submit_thumbnail(frame, file_path)
+
+        return ScreenshotResult(
+            success=True,
+            file_path=file_path,
+            timestamp=timestamp,
+            backend_used="dxcam",
+            image=frame,
+            save_future=save_future,
+            thumbnail_path=thumbnail_path,
+            thumbnail_future=thumbnail_future,
+        )
+
+    def _submit_thumbnail(
+        self, image, file_path: str, bgr: bool = False
+    ) -> Tuple[Optional[str], Optional[Future]]:
+        """
+        在后台线程生成约 THUMBNAIL_WIDTH 宽的JPEG缩略图
 
-        screenshot = ImageGrab.grab()
+        需要numpy和PIL，不可用时返回 (None, None)。
+
+        Args:
+            image: (H, W, C) 像素数组
+            file_path: 原截图路径，缩略图保存为同名 _thumb.jpg
+            bgr: 像素是否为BGR(A)顺序
+        """
+        pil_image = _optional_module("PIL.Image")
+        if image is None or pil_image is None:
+            return None, None
+
+        shot = Path(file_path)
+        thumbnail_path = str(shot.with_name(f"{shot.stem}_thumb.jpg"))
+        step = max(1, image.shape[1] // self.THUMBNAIL_WIDTH)
+
+        def write_thumbnail():
+            # 行列使用相同步长，保持宽高比
+            small = image[::step, ::step, 2::-1] if bgr else image[::step, ::step, :3]
+            pil_image.fromarray(np.ascontiguousarray(small)).save(
+                thumbnail_path, quality=80
+            )
+
+        return thumbnail_path, self._io_pool.submit(write_thumbnail)
+
+    @staticmethod
+    def _write_rgb_png(frame, file_path: str):
+        """把 (H, W, 3) RGB 帧写成PNG（低压缩级别），优先PIL，其次mss.tools"""
+        pil_image = _optional_module("PIL.Image")
+        if pil_image is not None:
+            pil_image.fromarray(frame).save(file_path, compress_level=2)
+        else:
+            height, width = frame.shape[:2]
+            _optional_module("mss.tools").to_png(
+                np.ascontiguousarray(frame).tobytes(),
+                (width, height),
+                level=2,
+                output=file_path,
+            )
+
+    def _capture_with_pil(self, file_path: str, timestamp: str) -> ScreenshotResult:
+        """使用PIL截图"""
+        screenshot = _optional_module("PIL.ImageGrab").grab()
         screenshot.save(file_path)
 
         return ScreenshotResult(
             success=True,
             file_path=file_path,
-            timestamp=datetime.now().isoformat(),
+            timestamp=timestamp,
             backend_used="pil",
         )
 
-    def _capture_with_mss(self, file_path: str) -> ScreenshotResult:
+    def _capture_with_mss(self, file_path: str, timestamp: str) -> ScreenshotResult:
         """使用mss截图"""
-        import mss
-        import mss.tools
+        mss_tools = _optional_module("mss.tools")
+
+        # 直接抓取缓存的全屏区域，跳过 sct.shot() 每次重新解析显示器列表
+        sct_img = self._thread_sct().grab(self._monitor)
+
+        image = None
+        if NUMPY_AVAILABLE:
+            # 直接引用mss的原始BGRA缓冲区（零拷贝）
+            image = np.frombuffer(sct_img.raw, dtype=np.uint8).reshape(
+                sct_img.height, sct_img.width, 4
+            )
+
+        def write_png():
+            rgb = sct_img.rgb if image is None else self._bgra_to_rgb(image)
+            # 低压缩级别（2）编码速度远快于默认的6，文件体积增加有限
+            mss_tools.to_png(rgb, sct_img.size, level=2, output=file_path)
 
-        with mss.mss() as sct:
-            sct.shot(output=file_path)
+        save_future = self._io_pool.submit(write_png)
+        thumbnail_path, thumbnail_future = self._submit_thumbnail(
+            image, file_path, bgr=True
+        )
 
         return ScreenshotResult(
             success=True,
             file_path=file_path,
-            timestamp=datetime.now().isoformat(),
+            timestamp=timestamp,
             backend_used="mss",
+            image=image,
+            save_future=save_future,
+            thumbnail_path=thumbnail_path,
+            thumbnail_future=thumbnail_future,
         )
 
-    def _capture_with_pyautogui(self, file_path: str) -> ScreenshotResult:
-        """使用pyautogui截图"""
-        import pyautogui
+    def _bgra_to_rgb(self, image):
+        """
+        BGRA帧转为RGB字节视图，写入当前写盘线程复用的缓冲区
 
-        screenshot = pyautogui.screenshot()
+        缓冲区按线程缓存，只在屏幕尺寸变化时重新分配，
+        避免每帧为RGB转换分配一块整屏大小的内存。
+        """
+        shape = image.shape[:2] + (3,)
+        buf = getattr(self._rgb_bufs, "buf", None)
+        if buf is None or buf.shape != shape:
+            buf = np.empty(shape, dtype=np.uint8)
+            self._rgb_bufs.buf = buf
+        np.copyto(buf, image[..., 2::-1])
+        return buf.reshape(-1).data
+
+    def _capture_with_pyautogui(
+        self, file_path: str, timestamp: str
+    ) -> ScreenshotResult:
+        """使用pyautogui截图"""
+        screenshot = _optional_module("pyautogui").screenshot()
         screenshot.save(file_path)
 
         return ScreenshotResult(
             success=True,
             file_path=file_path,
-            timestamp=datetime.now().isoformat(),
+            timestamp=timestamp,
             backend_used="pyautogui",
         )
 
-    def _capture_mock(self, file_path: str) -> ScreenshotResult:
+    def close(self, wait: bool = True):
+        """
+        释放常驻的截图句柄和缓冲区（可重复调用）
+
+        Args:
+            wait: 是否等待未完成的截图写盘；析构和进程退出时为 False，避免阻塞
+        """
+        _OPEN_CAPTURES.discard(self)
+        self._io_pool.shutdown(wait=wait)
+        self._rgb_bufs = threading.local()
+        if self._cam is not None:
+            self._cam.stop()
+            self._cam = None
+        with self._sct_lock:
+            scts, self._scts = self._scts, []
+        self._sct_local = threading.local()
+        for sct in scts:
+            sct.close()
+
+    def __del__(self):
+        try:
+            self.close(wait=False)
+        except Exception:
+            pass
+
+    def _capture_mock(self, file_path: str, timestamp: str) -> ScreenshotResult:
         """模拟截图（当没有截图库时）"""
         logger.warning("⚠ 使用模拟截图模式（实际不会截图）")
         # 创建一个空文件作为占位符
@@ -252,33 +528,61 @@ class ScreenshotCapture:
         return ScreenshotResult(
             success=True,
             file_path=file_path,
-            timestamp=datetime.now().isoformat(),
+            timestamp=timestamp,
             backend_used="mock",
             error_message="使用模拟模式，未实际截图",
         )
 
 
+class _WindowFound(Exception):
+    """找到目标窗口后用于提前结束 EnumWindows"""
+
+
 class KiCadWindowDetector:
     """
     KiCad窗口检测器 - 检测KiCad是否运行及当前状态
     """
 
+    # 进程检测结果的缓存时间（秒），避免连续分析时反复扫描进程表
+    RUNNING_CACHE_TTL = 2.0
+    # 窗口标题的缓存时间（秒），避免频繁调用 EnumWindows
+    TITLE_CACHE_TTL = 0.5
+
     def __init__(self):
-        self.kicad_process_names = ["kicad.exe", "kicad", "pcbnew", "eeschema"]
+        self.kicad_process_names = frozenset(
+            {"kicad.exe", "kicad", "pcbnew", "eeschema"}
+        )
+        self._last_check: Tuple[float, bool] = (float("-inf"), False)
+        self._title_cache: Tuple[float, str] = (float("-inf"), "")
 
     def is_kicad_running(self) -> bool:
-        """检查KiCad是否正在运行"""
-        try:
-            import psutil
-
-            for proc in psutil.process_iter(["name"]):
-                if proc.info["name"] in self.kicad_process_names:
-                    return True
-            return False
-        except ImportError:
+        """检查KiCad是否正在运行（结果缓存 RUNNING_CACHE_TTL 秒）"""
+        now = time.monotonic()
+        checked_at, running = self._last_check
+        if now - checked_at < self.RUNNING_CACHE_TTL:
+            return running
+
+        # Windows上先查可见的KiCad窗口（与标题查询共用一次枚举），找不到再扫描进程表
+        running = (
+            sys.platform == "win32" and bool(self.get_kicad_window_title())
+        ) or self._scan_processes()
+        self._last_check = (now, running)
+        return running
+
+    def _scan_processes(self) -> bool:
+        """扫描进程表，找到第一个KiCad进程即返回"""
+        psutil = _optional_module("psutil")
+        if psutil is None:
             # 如果没有psutil，使用简单方法
             return self._check_kicad_simple()
 
+        # attrs 预取进程名，避免逐个进程调用 .name()
+        names = self.kicad_process_names
+        for proc in psutil.process_iter(attrs=["name"]):
+            if proc.info["name"] in names:
+                return True
+        return False
+
     def _check_kicad_simple(self) -> bool:
         """简单检查KiCad是否运行（Windows）"""
         try:
@@ -292,19 +596,36 @@ class KiCadWindowDetector:
             return False
 
     def get_kicad_window_title(self) -> str:
-        """获取KiCad窗口标题（Windows）"""
-        try:
-            import win32gui
+        """获取KiCad窗口标题（Windows，结果缓存 TITLE_CACHE_TTL 秒）"""
+        now = time.monotonic()
+        cached_at, title = self._title_cache
+        if now - cached_at < self.TITLE_CACHE_TTL:
+            return title
+
+        title = self._enum_kicad_window_title()
+        self._title_cache = (now, title)
+        return title
+
+    def _enum_kicad_window_title(self) -> str:
+        """枚举顶层窗口，返回第一个KiCad窗口标题（找到即停止枚举）"""
+        win32gui = _optional_module("win32gui")
+        if win32gui is None:
+            return ""
 
-            def callback(hwnd, titles):
-                if win32gui.IsWindowVisible(hwnd):
-                    title = win32gui.GetWindowText(hwnd)
-                    if "KiCad" in title or "kicad" in title:
-                        titles.append(title)
-                return True
+        def callback(hwnd, titles):
+            if win32gui.IsWindowVisible(hwnd):
+                title = win32gui.GetWindowText(hwnd)
+                if "KiCad" in title or "kicad" in title:
+                    titles.append(title)
+                    raise _WindowFound
+            return True
 
+        try:
             titles = []
-            win32gui.EnumWindows(callback, titles)
+            try:
+                win32gui.EnumWindows(callback, titles)
+            except _WindowFound:
+                pass
             return titles[0] if titles else ""
         except:
             return ""
@@ -315,19 +636,25 @@ class SimpleImageAnalyzer:
     简单图像分析器 - 基础图像分析（不依赖AI模型）
     """
 
-    def __init__(self):
+    def __init__(self, window_detector: Optional[KiCadWindowDetector] = None):
+        # 共享窗口检测器，复用其标题缓存
+        self.window_detector = window_detector or KiCadWindowDetector()
         self.view_patterns = {
             KiCadViewType.PCB_EDITOR: ["pcbnew", "pcb", "board"],
             KiCadViewType.SCHEMATIC: ["eeschema", "schematic", "sch"],
             KiCadViewType.PROJECT_MANAGER: ["project", "manager"],
         }
 
-    def analyze_screenshot(self, image_path: str) -> KiCadUIState:
+    def analyze_screenshot(self, image_path: str, image: Any = None) -> KiCadUIState:
         """
         分析截图内容
 
         注：这是一个简化版本，使用启发式规则。
         如果要使用AI视觉分析，需要集成多模态模型API。
+
+        Args:
+            image_path: 截图文件路径
+            image: 可选的内存像素数组 (H, W, C)，提供时不再从磁盘解码截图
         """
         state = KiCadUIState(
             view_type=KiCadViewType.UNKNOWN,
@@ -340,18 +667,19 @@ class SimpleImageAnalyzer:
         )
 
         # 尝试读取图像基本信息
-        try:
-            from PIL import Image
-
-            with Image.open(image_path) as img:
-                width, height = img.size
-                logger.info(f"  截图尺寸: {width}x{height}")
-        except:
-            pass
+        if image is not None:
+            height, width = image.shape[:2]
+            logger.info(f"  截图尺寸: {width}x{height}")
+        else:
+            try:
+                with _optional_module("PIL.Image").open(image_path) as img:
+                    width, height = img.size
+                    logger.info(f"  截图尺寸: {width}x{height}")
+            except:
+                pass
 
         # 检测窗口标题
-        detector = KiCadWindowDetector()
-        state.window_title = detector.get_kicad_window_title()
+        state.window_title = self.window_detector.get_kicad_window_title()
 
         # 根据窗口标题推测视图类型
         state.view_type = self._detect_view_type(state.window_title)
@@ -360,67 +688,80 @@ class SimpleImageAnalyzer:
 
     def _detect_view_type(self, window_title: str) -> KiCadViewType:
         """根据窗口标题检测视图类型"""
-        title_lower = window_title.lower()
-
-        if "pcbnew" in title_lower or "pcb" in title_lower:
-            return KiCadViewType.PCB_EDITOR
-        elif "eeschema" in title_lower or "schematic" in title_lower:
-            return KiCadViewType.SCHEMATIC
-        elif "project" in title_lower:
-            return KiCadViewType.PROJECT_MANAGER
-        elif "error" in title_lower or "错误" in title_lower:
-            return KiCadViewType.ERROR
-
-        return KiCadViewType.UNKNOWN
-
-
-class DesignAdvisor:
-    """
-    设计建议生成器 - 基于分析结果生成改进建议
-    """
-
-    def __init__(self):
-        self.common_issues = self._load_common_issues()
-
-    def _load_common_issues(self) -> Dict[str, Dict]:
-        """加载常见问题库"""
-        return {
-            "missing_outline": {
+        # 一次扫描标题，取优先级最高（分组序号最小）的命中
+        best = None
+        for m in _VIEW_RE.finditer(window_title):
+            if best is None or m.lastindex < best:
+                best = m.lastindex
+                if best == 1:
+                    break
+
+        return _VIEW_BY_GROUP[best] if best else KiCadViewType.UNKNOWN
+
+
+# 常见问题库（只读，导入时构建一次）
+_COMMON_ISSUES: Mapping[str, Mapping[str, Any]] = MappingProxyType(
+    {
+        "missing_outline": MappingProxyType(
+            {
                 "type": "缺少板框",
                 "severity": "critical",
                 "description": "PCB没有定义板框(Edge.Cuts层)",
                 "suggestion": "使用'绘制线条'工具在Edge.Cuts层绘制板框",
                 "auto_fixable": True,
-            },
-            "missing_copper_pour": {
+            }
+        ),
+        "missing_copper_pour": MappingProxyType(
+            {
                 "type": "缺少敷铜",
                 "severity": "warning",
                 "description": "没有发现GND平面敷铜",
                 "suggestion": "添加敷铜区域连接到GND网络，提高信号完整性",
                 "auto_fixable": True,
-            },
-            "unconnected_nets": {
+            }
+        ),
+        "unconnected_nets": MappingProxyType(
+            {
                 "type": "未连接网络",
                 "severity": "critical",
                 "description": "存在未连接的飞线(Ratsnest)",
                 "suggestion": "完成布线或检查网络连接",
                 "auto_fixable": False,
-            },
-            "no_tracks": {
+            }
+        ),
+        "no_tracks": MappingProxyType(
+            {
                 "type": "缺少走线",
                 "severity": "warning",
                 "description": "PCB上没有走线",
                 "suggestion": "添加走线连接各个元件",
                 "auto_fixable": False,
-            },
-            "drc_errors": {
+            }
+        ),
+        "drc_errors": MappingProxyType(
+            {
                 "type": "DRC错误",
                 "severity": "critical",
                 "description": "存在设计规则检查错误",
                 "suggestion": "运行DRC检查并修复所有错误",
                 "auto_fixable": False,
-            },
-        }
+            }
+        ),
+    }
+)
+
+
+class DesignAdvisor:
+    """
+    设计建议生成器 - 基于分析结果生成改进建议
+    """
+
+    # 严重程度排序键与对应图标
+    _SEVERITY_ORDER = {"critical": 0, "warning": 1, "info": 2}
+    _ICONS = {"critical": "🔴", "warning": "🟡", "info": "🔵"}
+
+    def __init__(self):
+        self.common_issues = _COMMON_ISSUES
 
     def analyze_design(
         self, ui_state: KiCadUIState, pcb_file: Optional[str] = None
@@ -457,11 +798,11 @@ class DesignAdvisor:
         issues = []
 
         try:
-            with open(pcb_file, "r", encoding="utf-8") as f:
-                content = f.read()
+            tokens = self._scan_pcb_tokens(pcb_file)
+            segment_count = tokens["segment"]
 
             # 检查板框
-            if "(gr_line" not in content and "(edge" not in content.lower():
+            if not tokens["outline"]:
                 issue_info = self.common_issues["missing_outline"]
                 issues.append(
                     DesignIssue(
@@ -475,7 +816,7 @@ class DesignAdvisor:
                 )
 
             # 检查敷铜
-            if "(zone" not in content.lower():
+            if not tokens["zone"]:
                 issue_info = self.common_issues["missing_copper_pour"]
                 issues.append(
                     DesignIssue(
@@ -489,7 +830,6 @@ class DesignAdvisor:
                 )
 
             # 检查走线
-            segment_count = content.count("(segment")
             if segment_count < 5:
                 issue_info = self.common_issues["no_tracks"]
                 issues.append(
@@ -508,6 +848,43 @@ class DesignAdvisor:
 
         return issues
 
+    @classmethod
+    def _scan_pcb_tokens(cls, pcb_file: str) -> Dict[str, Any]:
+        """
+        扫描PCB文件中的板框、敷铜和走线标记
+
+        全部在字节域用 bytes.find/count（libc级子串搜索）完成，无需解码和小写复制。
+
+        Returns:
+            Dict: outline(是否有板框), zone(是否有敷铜), segment(走线数)
+        """
+        with open(pcb_file, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < _PCB_MMAP_THRESHOLD:
+                data = f.read()
+                return cls._scan_pcb_buffer(data, data.count(b"(segment"))
+            # 大文件交给内核按需分页；mmap没有count，走线数分块统计
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                segment_count = 0
+                tail = b""
+                for start in range(0, size, _PCB_SCAN_CHUNK):
+                    chunk = tail + mm[start : start + _PCB_SCAN_CHUNK]
+                    segment_count += chunk.count(b"(segment")
+                    # 保留 len("(segment") - 1 字节，跨块的标记不会漏计或重复计
+                    tail = chunk[-7:]
+                return cls._scan_pcb_buffer(mm, segment_count)
+
+    @staticmethod
+    def _scan_pcb_buffer(data, segment_count: int) -> Dict[str, Any]:
+        """在 bytes 或 mmap 上检查板框与敷铜标记"""
+        outline = (
+            data.find(b"(gr_line") != -1
+            or data.find(b"(edge") != -1
+            or _PCB_EDGE_RE.search(data) is not None
+        )
+        zone = data.find(b"(zone") != -1 or _PCB_ZONE_RE.search(data) is not None
+        return {"outline": outline, "zone": zone, "segment": segment_count}
+
     def calculate_score(self, issues: List[DesignIssue]) -> int:
         """计算设计得分（0-100）"""
         score = 100
@@ -527,16 +904,13 @@ class DesignAdvisor:
         suggestions = []
 
         # 按严重程度排序
-        severity_order = {"critical": 0, "warning": 1, "info": 2}
-        sorted_issues = sorted(issues, key=lambda x: severity_order.get(x.severity, 3))
+        order = self._SEVERITY_ORDER
+        sorted_issues = sorted(issues, key=lambda x: order.get(x.severity, 3))
 
+        icons = self._ICONS
         for issue in sorted_issues:
-            if issue.severity == "critical":
-                suggestions.append(f"🔴 {issue.issue_type}: {issue.suggestion}")
-            elif issue.severity == "warning":
-                suggestions.append(f"🟡 {issue.issue_type}: {issue.suggestion}")
-            else:
-                suggestions.append(f"🔵 {issue.issue_type}: {issue.suggestion}")
+            icon = icons.get(issue.severity, "🔵")
+            suggestions.append(f"{icon} {issue.issue_type}: {issue.suggestion}")
 
         if not suggestions:
             suggestions.append("✅ 设计看起来不错！建议运行DRC检查确认。")
@@ -549,17 +923,28 @@ class KiCadAutoAnalyzer:
     KiCad自动分析器 - 主控制器
 
     小白只需要调用 analyze() 方法，一键完成所有分析
+    可作为上下文管理器使用，退出时释放截图资源
     """
 
     def __init__(self, output_dir: str = "./analysis_reports"):
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
 
-        self.screenshot_capture = ScreenshotCapture(output_dir / "screenshots")
+        self.screenshot_capture = ScreenshotCapture(self.output_dir / "screenshots")
         self.window_detector = KiCadWindowDetector()
-        self.image_analyzer = SimpleImageAnalyzer()
+        self.image_analyzer = SimpleImageAnalyzer(self.window_detector)
         self.design_advisor = DesignAdvisor()
 
+    def __enter__(self) -> "KiCadAutoAnalyzer":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        """释放截图后端资源"""
+        self.screenshot_capture.close()
+
     def analyze(
         self, pcb_file: Optional[str] = None, auto_fix: bool = False, wait_time: int = 2
     ) -> AnalysisReport:
@@ -604,7 +989,12 @@ class KiCadAutoAnalyzer:
 
         # 4. 分析截图
         print("\n🧠 步骤4: 分析界面状态...")
-        ui_state = self.image_analyzer.analyze_screenshot(screenshot_result.file_path)
+        if screenshot_result.image is None and screenshot_result.save_future:
+            # 没有内存图像时需要等截图文件落盘（写盘失败在保存报告前记录）
+            screenshot_result.save_future.exception()
+        ui_state = self.image_analyzer.analyze_screenshot(
+            screenshot_result.file_path, image=screenshot_result.image
+        )
         print(f"  当前视图: {ui_state.view_type.value}")
         print(f"  窗口标题: {ui_state.window_title}")
 
@@ -614,14 +1004,9 @@ class KiCadAutoAnalyzer:
 
         if issues:
             print(f"  发现问题: {len(issues)}个")
+            icons = DesignAdvisor._ICONS
             for issue in issues:
-                icon = (
-                    "🔴"
-                    if issue.severity == "critical"
-                    else "🟡"
-                    if issue.severity == "warning"
-                    else "🔵"
-                )
+                icon = icons.get(issue.severity, "🔵")
                 print(f"    {icon} {issue.issue_type}: {issue.description}")
         else:
             print("  ✅ 未发现明显问题")
@@ -658,7 +1043,12 @@ class KiCadAutoAnalyzer:
             next_steps=self._generate_next_steps(issues, score),
         )
 
-        # 9. 保存报告
+        # 9. 保存报告（确保报告引用的截图文件已写完）
+        if screenshot_result.save_future is not None:
+            try:
+                screenshot_result.save_future.result()
+            except Exception as e:
+                logger.error(f"截图保存失败: {e}")
         self._save_report(report)
 
         print("\n" + "=" * 70)
@@ -667,6 +1057,86 @@ class KiCadAutoAnalyzer:
 
         return report
 
+    def analyze_stream(
+        self, interval: float = 1.0, pcb_file: Optional[str] = None
+    ) -> Iterator[AnalysisReport]:
+        """
+        连续监控模式：后台线程按间隔截图，当前线程分析，二者流水线并行
+
+        截图队列最多缓存2帧，分析跟不上时丢弃最旧的帧，避免积压。
+        关闭生成器（break 或 close()）即停止截图线程。
+
+        Args:
+            interval: 两次截图之间的间隔（秒）
+            pcb_file: 可选的PCB文件路径，用于深度分析
+
+        Yields:
+            AnalysisReport: 每一帧的分析报告
+        """
+        if not self.window_detector.is_kicad_running():
+            logger.warning("未检测到KiCad进程，停止连续分析")
+            return
+
+        frames: "queue.Queue[ScreenshotResult]" = queue.Queue(maxsize=2)
+        stop = threading.Event()
+
+        def producer():
+            capture = self.screenshot_capture
+            frame_no = 0
+            try:
+                while not stop.is_set():
+                    started = time.monotonic()
+                    frame_no += 1
+                    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                    result = capture.capture(f"kicad_{stamp}_{frame_no:06d}.png")
+                    try:
+                        frames.put_nowait(result)
+                    except queue.Full:
+                        # 丢弃最旧的一帧，只保留最新画面
+                        try:
+                            frames.get_nowait()
+                        except queue.Empty:
+                            pass
+                        frames.put_nowait(result)
+                    stop.wait(max(0.0, interval - (time.monotonic() - started)))
+            finally:
+                # mss句柄在本线程内创建，也在本线程内关闭
+                capture._release_thread_sct()
+
+        worker = threading.Thread(
+            target=producer, name="kicad-analyze-capture", daemon=True
+        )
+        worker.start()
+        try:
+            while True:
+                result = frames.get()
+                if not result.success:
+                    logger.error(f"截图失败: {result.error_message}")
+                    continue
+
+                ui_state = self.image_analyzer.analyze_screenshot(
+                    result.file_path, image=result.image
+                )
+                issues = self.design_advisor.analyze_design(ui_state, pcb_file)
+                score = self.design_advisor.calculate_score(issues)
+                report = AnalysisReport(
+                    screenshot_file=result.file_path,
+                    timestamp=datetime.now().isoformat(),
+                    ui_state=ui_state,
+                    issues_found=issues,
+                    overall_score=score,
+                    suggestions=self.design_advisor.generate_suggestions(issues),
+                    auto_fixes_available=[],
+                    next_steps=self._generate_next_steps(issues, score),
+                )
+                if result.save_future is not None:
+                    result.save_future.exception()
+                self._save_report(report)
+                yield report
+        finally:
+            stop.set()
+            worker.join()
+
     def _apply_auto_fixes(self, issues: List[DesignIssue]) -> List[str]:
         """应用自动修复"""
         fixed = []
@@ -683,6 +1153,7 @@ class KiCadAutoAnalyzer:
     def _generate_next_steps(self, issues: List[DesignIssue], score: int) -> List[str]:
         """生成下一步操作建议"""
         steps = []
+        issue_types = {i.issue_type for i in issues}
 
         if score < 60:
             steps.append("优先修复关键问题（红色标记）")
@@ -690,7 +1161,7 @@ class KiCadAutoAnalyzer:
         if score < 80:
             steps.append("运行DRC检查确认所有规则")
 
-        if any(i.issue_type == "缺少敷铜" for i in issues):
+        if "缺少敷铜" in issue_types:
             steps.append("添加GND平面敷铜")
 
         steps.append("导出Gerber文件准备制造")
@@ -720,33 +1191,22 @@ class KiCadAutoAnalyzer:
 
     def _save_report(self, report: AnalysisReport):
         """保存分析报告"""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        # 精确到微秒：连续监控模式下每秒可能产生多份报告
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
         report_file = self.output_dir / f"analysis_report_{timestamp}.json"
 
-        # 转换为字典
-        report_dict = {
-            "screenshot_file": report.screenshot_file,
-            "timestamp": report.timestamp,
-            "ui_state": {
-                "view_type": report.ui_state.view_type.value,
-                "window_title": report.ui_state.window_title,
-            },
-            "issues_found": [
-                {
-                    "type": i.issue_type,
-                    "severity": i.severity,
-                    "description": i.description,
-                    "suggestion": i.suggestion,
-                }
-                for i in report.issues_found
-            ],
-            "overall_score": report.overall_score,
-            "suggestions": report.suggestions,
-            "next_steps": report.next_steps,
-        }
+        # 完整转换为字典（枚举在序列化时输出其值）；
+        # 问题条目沿用原报告格式的键名 "type"，其余字段在原有键之外追加
+        report_dict = asdict(report)
+        report_dict["issues_found"] = [
+            {"type": issue.pop("issue_type"), **issue}
+            for issue in report_dict["issues_found"]
+        ]
 
         with open(report_file, "w", encoding="utf-8") as f:
-            json.dump(report_dict, f, indent=2, ensure_ascii=False)
+            json.dump(
+                report_dict, f, indent=2, ensure_ascii=False, default=_json_default
+            )
 
         print(f"\n📄 报告已保存: {report_file}")
 
@@ -794,10 +1254,10 @@ def main():
     args = parser.parse_args()
 
     # 创建分析器并运行
-    analyzer = KiCadAutoAnalyzer(output_dir=args.output)
-    report = analyzer.analyze(
-        pcb_file=args.pcb, auto_fix=args.auto_fix, wait_time=args.wait
-    )
+    with KiCadAutoAnalyzer(output_dir=args.output) as analyzer:
+        report = analyzer.analyze(
+            pcb_file=args.pcb, auto_fix=args.auto_fix, wait_time=args.wait
+        )
 
     # 返回退出码
     return 0 if report.overall_score >= 60 else 1
@@ -3,10 +3,18 @@
 确保生成的文件可直接在KiCad GUI中打开。
 """
 
+import functools
+import itertools
 import os
+import re
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from string import Template
+from typing import Dict, Iterable, List, Optional, Tuple
 
 # PCB 文件内容 - 修正版，使用正确的KiCad 9.0格式
+# 标题栏字段与UUID公共前缀为 string.Template 占位符（${title}、${uuid_base} 等），
+# 见 DEFAULT_PARAMS
 PCB_CONTENT = """(kicad_pcb (version 20240108) (generator "nlp-designer")
   (general
     (thickness 1.6)
@@ -20,10 +28,10 @@ PCB_CONTENT = """(kicad_pcb (version 20240108) (generator "nlp-designer")
   (paper "A4")
 
   (title_block
-    (title "LED Circuit")
-    (date "2026-02-06")
-    (rev "1")
-    (company "Auto Generated")
+    (title "${title}")
+    (date "${date}")
+    (rev "${rev}")
+    (company "${company}")
   )
 
   (layers
@@ -98,7 +106,7 @@ PCB_CONTENT = """(kicad_pcb (version 20240108) (generator "nlp-designer")
   (footprint "Resistor_SMD:R_0805_2012Metric"
     (layer "F.Cu")
     (tedit 646696B5)
-    (tstamp 6686A589-0C58-0DC1-0DA8-0001)
+    (tstamp ${uuid_base}0001)
     (at 25.4 25.4 0)
     (descr "Resistor SMD 0805")
     (tags "Resistor")
@@ -110,13 +118,13 @@ PCB_CONTENT = """(kicad_pcb (version 20240108) (generator "nlp-designer")
       (at 0 -1.65 0)
       (layer "F.SilkS")
       (effects (font (size 1 1) (thickness 0.15)))
-      (tstamp 6686A589-0C58-0DC1-0DA8-0011)
+      (tstamp ${uuid_base}0011)
     )
     (fp_text value "1k"
       (at 0 1.65 0)
       (layer "F.Fab")
       (effects (font (size 1 1) (thickness 0.15)))
-      (tstamp 6686A589-0C58-0DC1-0DA8-0012)
+      (tstamp ${uuid_base}0012)
     )
     (pad "1" smd roundrect
       (at -0.9125 0 0)
@@ -124,7 +132,7 @@ PCB_CONTENT = """(kicad_pcb (version 20240108) (generator "nlp-designer")
       (layers "F.Cu" "F.Paste" "F.Mask")
       (roundrect_rratio 0.25)
       (net 2 "+5V")
-      (tstamp 6686A589-0C58-0DC1-0DA8-0021)
+      (tstamp ${uuid_base}0021)
     )
     (pad "2" smd roundrect
       (at 0.9125 0 0)
@@ -132,14 +140,14 @@ PCB_CONTENT = """(kicad_pcb (version 20240108) (generator "nlp-designer")
       (layers "F.Cu" "F.Paste" "F.Mask")
       (roundrect_rratio 0.25)
       (net 3 "Net-(R1-Pad2)")
-      (tstamp 6686A589-0C58-0DC1-0DA8-0022)
+      (tstamp ${uuid_base}0022)
     )
   )
 
   (footprint "LED_SMD:LED_0805_2012Metric"
     (layer "F.Cu")
     (tedit 646696B6)
-    (tstamp 6686A589-0C58-0DC1-0DA8-0002)
+    (tstamp ${uuid_base}0002)
     (at 50.8 25.4 180)
     (descr "LED SMD 0805")
     (tags "LED")
@@ -151,13 +159,13 @@ PCB_CONTENT = """(kicad_pcb (version 20240108) (generator "nlp-designer")
       (at 0 -1.65 0)
       (layer "F.SilkS")
       (effects (font (size 1 1) (thickness 0.15)))
-      (tstamp 6686A589-0C58-0DC1-0DA8-0031)
+      (tstamp ${uuid_base}0031)
     )
     (fp_text value "Red"
       (at 0 1.65 0)
       (layer "F.Fab")
       (effects (font (size 1 1) (thickness 0.15)))
-      (tstamp 6686A589-0C58-0DC1-0DA8-0032)
+      (tstamp ${uuid_base}0032)
     )
     (pad "1" smd roundrect
       (at -0.9125 0 180)
@@ -165,7 +173,7 @@ PCB_CONTENT = """(kicad_pcb (version 20240108) (generator "nlp-designer")
       (layers "F.Cu" "F.Paste" "F.Mask")
       (roundrect_rratio 0.25)
       (net 3 "Net-(R1-Pad2)")
-      (tstamp 6686A589-0C58-0DC1-0DA8-0041)
+      (tstamp ${uuid_base}0041)
     )
     (pad "2" smd roundrect
       (at 0.9125 0 180)
@@ -173,7 +181,7 @@ PCB_CONTENT = """(kicad_pcb (version 20240108) (generator "nlp-designer")
       (layers "F.Cu" "F.Paste" "F.Mask")
       (roundrect_rratio 0.25)
       (net 1 "GND")
-      (tstamp 6686A589-0C58-0DC1-0DA8-0042)
+      (tstamp ${uuid_base}0042)
     )
   )
 
@@ -182,28 +190,28 @@ PCB_CONTENT = """(kicad_pcb (version 20240108) (generator "nlp-designer")
     (end 70 10)
     (layer "Edge.Cuts")
     (width 0.1)
-    (tstamp 6686A589-0C58-0DC1-0DA8-0050)
+    (tstamp ${uuid_base}0050)
   )
   (gr_line
     (start 70 10)
     (end 70 40)
     (layer "Edge.Cuts")
     (width 0.1)
-    (tstamp 6686A589-0C58-0DC1-0DA8-0051)
+    (tstamp ${uuid_base}0051)
   )
   (gr_line
     (start 70 40)
     (end 10 40)
     (layer "Edge.Cuts")
     (width 0.1)
-    (tstamp 6686A589-0C58-0DC1-0DA8-0052)
+    (tstamp ${uuid_base}0052)
   )
   (gr_line
     (start 10 40)
     (end 10 10)
     (layer "Edge.Cuts")
     (width 0.1)
-    (tstamp 6686A589-0C58-0DC1-0DA8-0053)
+    (tstamp ${uuid_base}0053)
   )
 
   (segment
@@ -212,7 +220,7 @@ PCB_CONTENT = """(kicad_pcb (version 20240108) (generator "nlp-designer")
     (width 0.25)
     (layer "F.Cu")
     (net 3)
-    (tstamp 6686A589-0C58-0DC1-0DA8-0060)
+    (tstamp ${uuid_base}0060)
   )
   (segment
     (start 40.0 25.4)
@@ -220,7 +228,7 @@ PCB_CONTENT = """(kicad_pcb (version 20240108) (generator "nlp-designer")
     (width 0.25)
     (layer "F.Cu")
     (net 3)
-    (tstamp 6686A589-0C58-0DC1-0DA8-0061)
+    (tstamp ${uuid_base}0061)
   )
   (segment
     (start 40.0 27.94)
@@ -228,7 +236,7 @@ PCB_CONTENT = """(kicad_pcb (version 20240108) (generator "nlp-designer")
     (width 0.25)
     (layer "F.Cu")
     (net 3)
-    (tstamp 6686A589-0C58-0DC1-0DA8-0062)
+    (tstamp ${uuid_base}0062)
   )
   (segment
     (start 49.8875 27.94)
@@ -236,7 +244,7 @@ PCB_CONTENT = """(kicad_pcb (version 20240108) (generator "nlp-designer")
     (width 0.25)
     (layer "F.Cu")
     (net 3)
-    (tstamp 6686A589-0C58-0DC1-0DA8-0063)
+    (tstamp ${uuid_base}0063)
   )
   (segment
     (start 51.7125 27.94)
@@ -244,21 +252,21 @@ PCB_CONTENT = """(kicad_pcb (version 20240108) (generator "nlp-designer")
     (width 0.25)
     (layer "F.Cu")
     (net 3)
-    (tstamp 6686A589-0C58-0DC1-0DA8-0064)
+    (tstamp ${uuid_base}0064)
   )
 )
 """
 
 # SCH 文件内容 - 简化版
 SCH_CONTENT = """(kicad_sch (version 20240108) (generator "nlp-designer")
-  (uuid 6686A589-0C58-0DC1-0DA8-0000)
+  (uuid ${uuid_base}0000)
   (paper "A4")
 
   (title_block
-    (title "LED Circuit")
-    (date "2026-02-06")
-    (rev "1")
-    (company "Auto Generated")
+    (title "${title}")
+    (date "${date}")
+    (rev "${rev}")
+    (company "${company}")
   )
 
   (lib_symbols
@@ -486,37 +494,37 @@ SCH_CONTENT = """(kicad_sch (version 20240108) (generator "nlp-designer")
   )
 
   (junction (at 31.75 35.56) (diameter 0) (color 0 0 0 0)
-    (uuid 6686A589-0C58-0DC1-0DA8-0100)
+    (uuid ${uuid_base}0100)
   )
 
   (wire (pts (xy 31.75 30.48) (xy 31.75 35.56))
     (stroke (width 0) (type default))
-    (uuid 6686A589-0C58-0DC1-0DA8-0200)
+    (uuid ${uuid_base}0200)
   )
   (wire (pts (xy 31.75 35.56) (xy 38.1 35.56))
     (stroke (width 0) (type default))
-    (uuid 6686A589-0C58-0DC1-0DA8-0201)
+    (uuid ${uuid_base}0201)
   )
   (wire (pts (xy 38.1 35.56) (xy 38.1 30.48))
     (stroke (width 0) (type default))
-    (uuid 6686A589-0C58-0DC1-0DA8-0202)
+    (uuid ${uuid_base}0202)
   )
   (wire (pts (xy 38.1 35.56) (xy 38.1 43.18))
     (stroke (width 0) (type default))
-    (uuid 6686A589-0C58-0DC1-0DA8-0203)
+    (uuid ${uuid_base}0203)
   )
   (wire (pts (xy 38.1 43.18) (xy 31.75 43.18))
     (stroke (width 0) (type default))
-    (uuid 6686A589-0C58-0DC1-0DA8-0204)
+    (uuid ${uuid_base}0204)
   )
   (wire (pts (xy 31.75 43.18) (xy 31.75 40.64))
     (stroke (width 0) (type default))
-    (uuid 6686A589-0C58-0DC1-0DA8-0205)
+    (uuid ${uuid_base}0205)
   )
 
   (symbol (lib_id "Device:R") (at 31.75 35.56 90) (unit 1)
     (in_bom yes) (on_board yes) (dnp no)
-    (uuid 6686A589-0C58-0DC1-0DA8-0300)
+    (uuid ${uuid_base}0300)
     (property "Reference" "R1"
       (at 33.02 34.29 90)
       (effects (font (size 1.27 1.27)) (justify left))
@@ -529,14 +537,14 @@ SCH_CONTENT = """(kicad_sch (version 20240108) (generator "nlp-designer")
       (at 33.655 35.56 90)
       (effects (font (size 1.27 1.27)) hide)
     )
-    (pin "1" (uuid 6686A589-0C58-0DC1-0DA8-0301))
-    (pin "2" (uuid 6686A589-0C58-0DC1-0DA8-0302))
+    (pin "1" (uuid ${uuid_base}0301))
+    (pin "2" (uuid ${uuid_base}0302))
   )
 
   (symbol (lib_id "Device:LED") (at 38.1 35.56 90) (unit 1)
     (in_bom yes) (on_board yes) (dnp no)
     (mirror y)
-    (uuid 6686A589-0C58-0DC1-0DA8-0400)
+    (uuid ${uuid_base}0400)
     (property "Reference" "D1"
       (at 36.83 34.29 90)
       (effects (font (size 1.27 1.27)) (justify right))
@@ -549,13 +557,13 @@ SCH_CONTENT = """(kicad_sch (version 20240108) (generator "nlp-designer")
       (at 39.37 30.48 90)
       (effects (font (size 1.27 1.27)) hide)
     )
-    (pin "1" (uuid 6686A589-0C58-0DC1-0DA8-0401))
-    (pin "2" (uuid 6686A589-0C58-0DC1-0DA8-0402))
+    (pin "1" (uuid ${uuid_base}0401))
+    (pin "2" (uuid ${uuid_base}0402))
   )
 
   (symbol (lib_id "power:+5V") (at 31.75 30.48 0) (unit 1)
     (in_bom yes) (on_board yes) (dnp no)
-    (uuid 6686A589-0C58-0DC1-0DA8-0500)
+    (uuid ${uuid_base}0500)
     (property "Reference" "#PWR01"
       (at 31.75 26.67 0)
       (effects (font (size 1.27 1.27)) hide)
@@ -564,12 +572,12 @@ SCH_CONTENT = """(kicad_sch (version 20240108) (generator "nlp-designer")
       (at 31.75 29.21 0)
       (effects (font (size 1.27 1.27)))
     )
-    (pin "1" (uuid 6686A589-0C58-0DC1-0DA8-0501))
+    (pin "1" (uuid ${uuid_base}0501))
   )
 
   (symbol (lib_id "power:GND") (at 31.75 43.18 0) (unit 1)
     (in_bom yes) (on_board yes) (dnp no)
-    (uuid 6686A589-0C58-0DC1-0DA8-0600)
+    (uuid ${uuid_base}0600)
     (property "Reference" "#PWR02"
       (at 31.75 47.625 0)
       (effects (font (size 1.27 1.27)) hide)
@@ -578,7 +586,7 @@ SCH_CONTENT = """(kicad_sch (version 20240108) (generator "nlp-designer")
       (at 31.75 45.72 0)
       (effects (font (size 1.27 1.27)))
     )
-    (pin "1" (uuid 6686A589-0C58-0DC1-0DA8-0601))
+    (pin "1" (uuid ${uuid_base}0601))
   )
 
   (sheet_instances
@@ -588,24 +596,239 @@ SCH_CONTENT = """(kicad_sch (version 20240108) (generator "nlp-designer")
 """
 
 
-def generate_led_circuit(output_dir: str = "."):
-    """生成简单的LED电路"""
+# 标题栏默认值
+DEFAULT_PARAMS = {
+    "title": "LED Circuit",
+    "date": "2026-02-06",
+    "rev": "1",
+    "company": "Auto Generated",
+    # 所有UUID共用的前缀，末段为各对象的固定序号
+    "uuid_base": "6686A589-0C58-0DC1-0DA8-",
+}
+
+
+def _uuid_base(counter: int, batch: str) -> str:
+    """
+    按计数器和批次随机数生成UUID前缀
+
+    首段为序号，保证同一批内各板互不相同；中间三段为批次随机数
+    （12位十六进制），保证不同批次生成的同序号板也不会重复。
+    """
+    return f"{counter & 0xFFFFFFFF:08X}-{batch[:4]}-{batch[4:8]}-{batch[8:12]}-"
+
+
+# 模板预编译一次，参数替换为单次扫描
+_PCB_TPL = Template(PCB_CONTENT)
+_SCH_TPL = Template(SCH_CONTENT)
+
+# 默认内容导入时渲染并编码一次，写文件时直接写字节
+_PCB_BYTES = _PCB_TPL.substitute(DEFAULT_PARAMS).encode("utf-8")
+_SCH_BYTES = _SCH_TPL.substitute(DEFAULT_PARAMS).encode("utf-8")
+
+_WRITE_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+
+
+@functools.lru_cache(maxsize=1024)
+def _ensure_dir(path: str):
+    """创建输出目录；同一目录重复调用只是一次缓存查找，不再发起系统调用"""
+    Path(path).mkdir(parents=True, exist_ok=True)
+
+
+def _write_all(fd: int, data: bytes):
+    """把整块内容写入文件描述符（短写时继续写剩余部分）"""
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view) :]
+
+
+def _fast_write(path, data: bytes):
+    """绕过缓冲写入层，直接用 os.write 写入整块内容（通常一次系统调用完成）"""
+    fd = os.open(path, _WRITE_FLAGS, 0o644)
+    try:
+        _write_all(fd, data)
+    finally:
+        os.close(fd)
+
+
+_tmp_counter = itertools.count()
+
+
+def _link_tmpfile(directory: str, data: bytes, name: str) -> bool:
+    """写入 O_TMPFILE 匿名inode 后链接为 name；平台或文件系统不支持时返回 False"""
+    try:
+        fd = os.open(directory, os.O_TMPFILE | os.O_WRONLY, 0o644)
+    except OSError:
+        return False
+    try:
+        _write_all(fd, data)
+        os.link(f"/proc/self/fd/{fd}", name)
+        return True
+    except OSError:
+        return False
+    finally:
+        os.close(fd)
+
+
+def _atomic_write(path, data: bytes):
+    """
+    原子写入：目标路径上只会出现完整的旧文件或完整的新文件
+
+    Linux上先写入 O_TMPFILE 匿名inode，写完才链接到临时名，写入中途崩溃不会留下残缺文件；
+    其他情况直接写同目录临时文件。最后 os.replace 覆盖目标（linkat 不能覆盖已有文件）。
+    不做fsync，保证的是原子性而非掉电持久性。
+    """
+    path = os.fspath(path)
+    tmp_name = f"{path}.{os.getpid()}.{next(_tmp_counter)}.tmp"
+    linked = hasattr(os, "O_TMPFILE") and _link_tmpfile(
+        os.path.dirname(path) or ".", data, tmp_name
+    )
+    if not linked:
+        _fast_write(tmp_name, data)
+    try:
+        os.replace(tmp_name, path)
+    except OSError:
+        os.unlink(tmp_name)
+        raise
+
+
+def _sexpr_escape(value) -> str:
+    """转义S-expression字符串中的反斜杠和双引号"""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"')
+
+
+def render_led_circuit(params: Optional[Dict] = None) -> Tuple[bytes, bytes]:
+    """
+    在内存中生成LED电路文件内容，不落盘
+
+    返回的字节可直接交给任意存储（例如对象存储客户端的 put_object），
+    无需先写本地文件再上传。
+
+    Args:
+        params: 可选的标题栏参数，同 generate_led_circuit
+
+    Returns:
+        Tuple[bytes, bytes]: (原理图内容, PCB内容)，UTF-8编码
+    """
+    if not params:
+        return _SCH_BYTES, _PCB_BYTES
+    values = {**DEFAULT_PARAMS, **params}
+    values = {k: _sexpr_escape(v) for k, v in values.items()}
+    return (
+        _SCH_TPL.substitute(values).encode("utf-8"),
+        _PCB_TPL.substitute(values).encode("utf-8"),
+    )
+
+
+def generate_led_circuit(
+    output_dir: str = ".", params: Optional[Dict] = None, atomic: bool = False
+):
+    """
+    生成简单的LED电路
+
+    Args:
+        output_dir: 输出目录
+        params: 可选的标题栏参数（title/date/rev/company），未提供的字段使用默认值
+        atomic: 是否原子写入（批处理中断后不会留下写了一半的文件）
+    """
+    sch_bytes, pcb_bytes = render_led_circuit(params)
+
+    write = _atomic_write if atomic else _fast_write
     output_path = Path(output_dir)
-    output_path.mkdir(parents=True, exist_ok=True)
+    _ensure_dir(str(output_path))
 
     # 生成SCH文件
     sch_file = output_path / "led_circuit.kicad_sch"
-    with open(sch_file, "w", encoding="utf-8") as f:
-        f.write(SCH_CONTENT)
+    try:
+        write(sch_file, sch_bytes)
+    except FileNotFoundError:
+        # 目录在缓存之后被删除，清空缓存后重新创建
+        _ensure_dir.cache_clear()
+        _ensure_dir(str(output_path))
+        write(sch_file, sch_bytes)
 
     # 生成PCB文件
     pcb_file = output_path / "led_circuit.kicad_pcb"
-    with open(pcb_file, "w", encoding="utf-8") as f:
-        f.write(PCB_CONTENT)
+    write(pcb_file, pcb_bytes)
 
     return str(sch_file), str(pcb_file)
 
 
+# 带转义的双引号字符串、括号
+_SEXPR_STRING_RE = re.compile(rb'"(?:[^"\\]|\\.)*"')
+_SEXPR_PAREN_RE = re.compile(rb"[()]")
+
+
+def validate_sexpr(blob: bytes) -> bool:
+    """
+    检查S-expression结构是否完整：字符串闭合、括号配对、只有一个顶层表达式
+
+    先用正则（C实现）一次性去掉所有字符串，再只遍历括号位置，
+    不需要把整个文件解析成Python对象。
+    """
+    body = _SEXPR_STRING_RE.sub(b"", blob)
+    if b'"' in body:
+        return False  # 有未闭合的字符串
+
+    depth = 0
+    closed = False
+    for m in _SEXPR_PAREN_RE.finditer(body):
+        if closed:
+            return False  # 顶层表达式结束后还有内容
+        if m.group() == b"(":
+            depth += 1
+        else:
+            depth -= 1
+            if depth < 0:
+                return False
+            closed = depth == 0
+    return closed
+
+
+def _generate_board(job: Tuple[str, Optional[Dict]]) -> Tuple[str, str]:
+    """进程池任务：生成单块板（模块级函数，便于pickle）"""
+    output_dir, params = job
+    return generate_led_circuit(output_dir, params)
+
+
+def generate_many(
+    param_list: Iterable[Optional[Dict]],
+    out_root: str = ".",
+    workers: Optional[int] = None,
+) -> List[Tuple[str, str]]:
+    """
+    多进程批量生成LED电路，第i组参数输出到 out_root/board_i
+
+    每块板默认使用由序号i和本次调用的批次随机数生成的UUID前缀，
+    同一批及不同批次的板之间UUID互不重复。
+
+    Args:
+        param_list: 每块板的标题栏参数（None 表示使用默认值）
+        out_root: 输出根目录
+        workers: 进程数，默认CPU核数
+
+    Returns:
+        List[Tuple[str, str]]: 按输入顺序排列的 (原理图路径, PCB路径)
+    """
+    root = Path(out_root)
+    # 每次调用只取一次随机数
+    batch = os.urandom(6).hex().upper()
+    jobs = [
+        (
+            str(root / f"board_{i}"),
+            {"uuid_base": _uuid_base(i, batch), **(params or {})},
+        )
+        for i, params in enumerate(param_list)
+    ]
+    if not jobs:
+        return []
+
+    workers = workers or os.cpu_count() or 1
+    # 每个进程分到若干批任务，摊薄进程间通信开销
+    chunksize = max(1, len(jobs) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_generate_board, jobs, chunksize=chunksize))
+
+
 def main():
     sch_file, pcb_file = generate_led_circuit("./test_output")
     print(f"生成的文件:")
@@ -616,6 +839,8 @@ def main():
     print("- 生成的文件使用KiCad标准S-expression格式")
     print("- 可直接在KiCad 7.x/8.x/9.x GUI中打开")
     print("- 无需KiCad API依赖")
+    ok = all(validate_sexpr(Path(f).read_bytes()) for f in (sch_file, pcb_file))
+    print(f"- S-expression结构校验: {'通过' if ok else '失败'}")
 
 
 if __name__ == "__main__":